@@ -39,7 +39,7 @@ a = Analysis(
         'encodings.bz2_codec', 'encodings.rot_13',
         # Other unused modules
         'pdb', 'profile', 'cProfile', 'timeit',
-        'asyncio', 'concurrent', 'multiprocessing',
+        'asyncio', 'multiprocessing',
         'email', 'ftplib', 'telnetlib', 'poplib', 'imaplib',
         'smtplib', 'nntplib', 'http.server', 'wsgiref',
     ],
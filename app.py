@@ -2,6 +2,8 @@ import customtkinter as ctk
 import os
 from core.otp import AuthEngine
 from core.storage import Storage
+from core.save_queue import SaveQueue
+from core.secret_index import SecretIndex
 from ui.screens.login import LoginScreen
 from ui.screens.setup import SetupScreen
 from ui.screens.account_list import MainListScreen
@@ -9,11 +11,18 @@ from ui.screens.add_account import AddAccountScreen
 from ui.dialogs.password_dialog import ChangePasswordDialog
 from core.config import Config
 from core.secure_memory import secure_wipe_string, secure_wipe_list
+from ui.components import call_when_done
+from tkinter import messagebox
 import time
 
 ctk.set_appearance_mode("Dark")
 ctk.set_default_color_theme("blue")
 
+# Ticks land this long after each whole second, so int(time.time()) has always advanced
+TICK_SLACK_MS = 5
+# Wall clock moving this much more (or less) than the monotonic clock counts as a clock jump
+CLOCK_JUMP_THRESHOLD = 1.0
+
 class App(ctk.CTk):
     def __init__(self):
         super().__init__()
@@ -29,22 +38,44 @@ class App(ctk.CTk):
         if os.path.exists(icon_path):
             self.iconbitmap(icon_path)
 
+        # Config (also selects the storage backend)
+        self.config = Config()
+        
         # Backend Setup
         from core.utils import get_storage_path
         storage_path = get_storage_path("DO_NOT_DELETE_accounts.json")
         
         self.auth_engine = AuthEngine()
-        self.storage = Storage(filepath=storage_path)
+        if self.config.storage_backend == "sqlite":
+            # Per-account encrypted rows; an existing JSON vault is migrated on first unlock
+            from core.sqlite_storage import SQLiteStorage
+            self.storage = SQLiteStorage(filepath=get_storage_path("DO_NOT_DELETE_accounts.db"), legacy_path=storage_path)
+        else:
+            self.storage = Storage(filepath=storage_path)
+        # Edits are coalesced into one write after a short quiet period
+        self.save_queue = SaveQueue(self.storage)
         self.password = None
         self.accounts = []
+        # Digests of the loaded secrets, for duplicate checks on add/import
+        self.secret_index = SecretIndex()
         
         # Initialize critical security components
         self._superImportantFunction()
         
-        # Config and Auto-Lock Setup
-        self.config = Config()
+        # Auto-Lock Setup
         self.last_activity_time = time.time()
         self.is_locked = False
+        
+        # Tick timing: (wall, monotonic) of the previous tick, and an optional
+        # measurement hook called as hook(interval, delay_seconds) with the delay
+        # between each time-step boundary and its new codes being shown
+        self.last_tick = None
+        self.boundary_latency_hook = None
+        
+        # Low-power refresh state (see Config.hidden_refresh / idle_refresh)
+        self.timer_job = None
+        self.refresh_policy = "normal"
+        self.unfocused_since = None
 
         # Container for frames
         self.container = ctk.CTkFrame(self)
@@ -55,7 +86,7 @@ class App(ctk.CTk):
         self.current_screen = None
 
         # Start with Login/Setup
-        if os.path.exists(self.storage.filepath):
+        if self.storage.exists():
             self.show_login_screen()
         else:
             self.show_setup_screen()
@@ -66,6 +97,12 @@ class App(ctk.CTk):
         # Bind activity tracking
         self.bind("<FocusIn>", self._on_activity)
         self.bind("<FocusOut>", self._on_focus_out)
+        
+        # Wake the refresh loop as soon as the window is shown again
+        self.bind("<Map>", self._on_map, add="+")
+        
+        # Write pending edits before the window goes away
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def clear_container(self):
         for widget in self.container.winfo_children():
@@ -91,10 +128,43 @@ class App(ctk.CTk):
             self.password = password
             
         self.accounts = accounts
+        if self.storage.has_pending_secrets():
+            # Progressive unlock: show the list now, decrypt the secrets on
+            # the storage worker
+            self.save_queue.hold()
+            future = self.storage.submit(self.storage.load_secrets)
+            call_when_done(self, future, lambda f: self._on_secrets_loaded(f, accounts))
+        else:
+            # Compile per-account keys once instead of on every tick
+            self.auth_engine.compile_accounts(self.accounts)
+            self.secret_index.rebuild(self.accounts)
         self.is_locked = False
         self.last_activity_time = time.time()
         self.show_main_screen()
 
+    def _on_secrets_loaded(self, future, accounts):
+        # Ignore results for a session that has been locked meanwhile
+        if self.is_locked or accounts is not self.accounts:
+            return
+        
+        try:
+            loaded = future.result()
+        except Exception:
+            loaded = False
+        
+        if not loaded:
+            self.save_queue.release(discard=True)
+            messagebox.showerror("Error", "Failed to decrypt account secrets. The vault file may be damaged.")
+            self.lock()
+            return
+        
+        self.save_queue.release()
+        # Compiled here: the engine's key cache is only touched from the UI thread
+        self.auth_engine.compile_accounts(self.accounts)
+        self.secret_index.rebuild(self.accounts)
+        if hasattr(self.current_screen, 'on_secrets_loaded'):
+            self.current_screen.on_secrets_loaded()
+
     def show_main_screen(self):
         self.clear_container()
         self.current_screen = MainListScreen(self.container, self)
@@ -136,6 +206,20 @@ class App(ctk.CTk):
     def _on_activity(self, event=None):
         """Track when user interacts with the app"""
         self.last_activity_time = time.time()
+        self.unfocused_since = None
+        self._wake_timer()
+    
+    def _on_map(self, event=None):
+        """Window was restored/shown"""
+        if event is None or event.widget is self:
+            self._wake_timer()
+    
+    def _wake_timer(self):
+        """Leave low-power mode immediately instead of waiting for the slow tick"""
+        if self.refresh_policy != "normal" and self.timer_job is not None:
+            self.after_cancel(self.timer_job)
+            self.timer_job = None
+            self.update_timer()
     
     def _on_focus_out(self, event=None):
         """Called when app loses focus"""
@@ -148,6 +232,14 @@ class App(ctk.CTk):
             return
         
         self.is_locked = True
+        # Write pending edits before their key and data are wiped
+        self.save_queue.flush()
+        self.save_queue.release(discard=True)
+        # Drop cached codes before the secrets they were derived from are wiped
+        self.auth_engine.clear_cache()
+        self.secret_index.clear()
+        self.storage.lock()
+        
         # Secure wipe sensitive data
         secure_wipe_string(self.password)
         secure_wipe_list(self.accounts)
@@ -159,18 +251,91 @@ class App(ctk.CTk):
         # Return to login screen
         self.show_login_screen()
 
+    def on_close(self):
+        """Window closed: flush pending edits, then quit"""
+        try:
+            self.save_queue.flush()
+        except Exception:
+            pass
+        self.destroy()
+
     def update_timer(self):
+        self._check_clock_jump()
+        
+        policy = self._get_refresh_policy()
         try:
-            if hasattr(self.current_screen, 'update'):
-                self.current_screen.update()
+            if policy == "pause":
+                if self.refresh_policy != "pause" and hasattr(self.current_screen, 'pause'):
+                    self.current_screen.pause()
+            else:
+                if self.refresh_policy == "pause" and hasattr(self.current_screen, 'resume'):
+                    # Catch up with one batched refresh
+                    self.current_screen.resume()
+                if hasattr(self.current_screen, 'update'):
+                    self.current_screen.update()
         except Exception:
             pass
-            
-        self.after(1000, self.update_timer)
+        self.refresh_policy = policy
+        
+        delay = self.get_tick_delay()
+        if policy != "normal":
+            delay += (max(1, self.config.slow_refresh_seconds) - 1) * 1000
+        self.timer_job = self.after(delay, self.update_timer)
         
         # Check for auto-lock
         self._check_auto_lock()
     
+    def _get_refresh_policy(self):
+        """Pick the refresh policy from window visibility and focus"""
+        try:
+            if self.state() in ("iconic", "withdrawn") or not self.winfo_viewable():
+                return self.config.hidden_refresh
+        except Exception:
+            return "normal"
+        
+        if self.focus_get() is None:
+            if self.unfocused_since is None:
+                self.unfocused_since = time.time()
+            if time.time() - self.unfocused_since >= self.config.idle_after_seconds:
+                return self.config.idle_refresh
+        else:
+            self.unfocused_since = None
+        
+        return "normal"
+
+    def get_tick_delay(self):
+        """
+        Milliseconds until just after the next whole wall-clock second.
+        Computed from the clock on every tick, so a late tick does not push
+        the following ones late (no accumulated drift).
+        """
+        fraction_ms = int((time.time() % 1) * 1000)
+        return 1000 - fraction_ms + TICK_SLACK_MS
+
+    def _check_clock_jump(self):
+        """Detect wall-clock changes (NTP step, manual change) against the monotonic clock"""
+        now = time.time()
+        mono = time.monotonic()
+        
+        if self.last_tick is not None:
+            wall_elapsed = now - self.last_tick[0]
+            mono_elapsed = mono - self.last_tick[1]
+            if abs(wall_elapsed - mono_elapsed) > CLOCK_JUMP_THRESHOLD:
+                # Pending boundaries were computed for the old clock. While
+                # paused there are none; resume() recomputes them on wake.
+                try:
+                    if self.refresh_policy != "pause" and hasattr(self.current_screen, 'on_clock_jump'):
+                        self.current_screen.on_clock_jump()
+                except Exception:
+                    pass
+        
+        self.last_tick = (now, mono)
+
+    def report_boundary_latency(self, interval, delay):
+        """Pass boundary-to-display delay measurements to the hook, if one is set"""
+        if self.boundary_latency_hook is not None:
+            self.boundary_latency_hook(interval, delay)
+
     def _check_auto_lock(self):
         """Check if auto-lock should trigger"""
         # Skip if already locked or if auto-lock is disabled
@@ -224,3 +389,5 @@ if __name__ == "__main__":
     app = App()
     app._setup_exception_handler()
     app.mainloop()
+    # Covers exits that bypass the close button
+    app.save_queue.flush()
@@ -0,0 +1,174 @@
+"""
+Headless bulk TOTP code generation.
+
+Streams the same JSON/CSV/otpauth input that Storage.import_accounts accepts
+(core.importer), splits the rows across a process pool (which validates
+and compiles them) and streams the codes out as CSV or JSON lines.
+Memory stays flat for any input size; rejected rows are reported on stderr.
+
+Usage:
+    python -m core.batch accounts.csv -o codes.csv
+    python -m core.batch backup.totpenc -o codes.csv   (asks for the passphrase)
+    python -m core.batch accounts.json --format jsonl --time 1700000000 --steps 10
+"""
+import argparse
+import csv
+import getpass
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from itertools import chain
+
+from core.export_container import ExportFileError, is_encrypted_export
+from core.importer import MAX_REPORTED_ERRORS, ImportReport, iter_record_chunks, validate_records
+from core.otp import AuthEngine
+
+OUTPUT_FIELDS = ['index', 'name', 'time_step', 'timestamp', 'code']
+
+# One engine per worker process, created lazily
+_engine = None
+
+def _get_engine():
+    global _engine
+    if _engine is None:
+        _engine = AuthEngine()
+    return _engine
+
+def generate_chunk(task):
+    """
+    Validate one chunk of input rows and generate codes for the valid ones.
+    Runs inside a worker process and returns (output text, accounts done,
+    rejected rows), so the parent process only has to write it out.
+
+    Args:
+        task: (records, for_time, steps, output_format) with records as
+            (row, record) pairs; the output index is the row's 0-based position
+    """
+    records, for_time, steps, output_format = task
+    engine = _get_engine()
+    valid, errors = validate_records(records)
+
+    # Group by interval so each group shares one timestamp per step
+    groups = {}
+    for row, acc in valid:
+        key = engine.compile_account(acc)
+        interval = acc.get('interval', 30)
+        groups.setdefault(interval, []).append((row - 1, acc.get('name', ''), key))
+
+    rows = []
+    for interval, members in groups.items():
+        keys = [member[2] for member in members]
+        first_step = int(for_time) // interval
+        for step in range(first_step, first_step + steps):
+            codes = engine.generate_totp_many(keys, step * interval)
+            for (index, name, _), code in zip(members, codes):
+                rows.append((index, name, step, step * interval, code))
+
+    # Compiled keys are only needed for this chunk
+    engine.clear_cache()
+
+    rows.sort()
+    out = io.StringIO()
+    if output_format == 'csv':
+        writer = csv.writer(out, lineterminator='\n')
+        writer.writerows(rows)
+    else:
+        for row in rows:
+            out.write(json.dumps(dict(zip(OUTPUT_FIELDS, row))))
+            out.write('\n')
+    return out.getvalue(), len(valid), errors
+
+def run(input_path, output, output_format='csv', for_time=None, steps=1, workers=None, chunk_size=2000, report=None, passphrase=None):
+    """
+    Generate codes for every account in input_path and write them to output.
+    Rejected rows are added to report (an ImportReport) if one is given.
+    passphrase is needed for encrypted exports.
+    Returns the number of accounts processed.
+    """
+    if for_time is None:
+        for_time = time.time()
+
+    chunks = (records for records, _ in iter_record_chunks(input_path, chunk_size, passphrase))
+    first = next(chunks, None)
+    if first is None:
+        return 0
+    chunks = chain([first], chunks)
+
+    if output_format == 'csv':
+        csv.writer(output, lineterminator='\n').writerow(OUTPUT_FIELDS)
+
+    tasks = ((records, for_time, steps, output_format) for records in chunks)
+    workers = workers or os.cpu_count() or 1
+    count = 0
+
+    def write(result):
+        nonlocal count
+        text, done, errors = result
+        output.write(text)
+        count += done
+        if report is not None:
+            report.add(errors)
+
+    if workers == 1:
+        for task in tasks:
+            write(generate_chunk(task))
+    else:
+        # Submitted from this thread and collected in input order, at most
+        # workers * 2 chunks ahead, so a huge file isn't pulled into memory
+        # ahead of the workers (Pool.imap would read its input as fast as it
+        # can). Nothing blocks inside the pool, so an error while writing
+        # (e.g. a closed pipe) still lets the pool shut down.
+        with multiprocessing.Pool(processes=workers) as pool:
+            pending = deque()
+            for task in tasks:
+                pending.append(pool.apply_async(generate_chunk, (task,)))
+                if len(pending) >= workers * 2:
+                    write(pending.popleft().get())
+            while pending:
+                write(pending.popleft().get())
+
+    return count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m core.batch", description="Generate TOTP codes for an account export or otpauth URI list.")
+    parser.add_argument("input", help="JSON/CSV export, encrypted export or otpauth URI list")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    parser.add_argument("-f", "--format", choices=["csv", "jsonl"], default="csv", help="Output format (default: csv)")
+    parser.add_argument("-t", "--time", type=float, default=None, help="Unix timestamp (default: now)")
+    parser.add_argument("-n", "--steps", type=int, default=1, help="Number of consecutive time steps per account (default: 1)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="Accounts per worker task (default: 2000)")
+    args = parser.parse_args(argv)
+
+    if args.steps < 1 or args.chunk_size < 1:
+        parser.error("--steps and --chunk-size must be at least 1")
+
+    passphrase = None
+    if is_encrypted_export(args.input):
+        passphrase = bytearray(getpass.getpass("Passphrase: ").encode('utf-8'))
+
+    report = ImportReport()
+    try:
+        if args.output:
+            with open(args.output, 'w', newline='') as f:
+                count = run(args.input, f, args.format, args.time, args.steps, args.workers, args.chunk_size, report, passphrase)
+        else:
+            count = run(args.input, sys.stdout, args.format, args.time, args.steps, args.workers, args.chunk_size, report, passphrase)
+    except ExportFileError as e:
+        print(f"Cannot read {args.input}: {e}", file=sys.stderr)
+        return 1
+
+    if report.count:
+        print(f"Skipped {report.count} invalid rows:\n{report.summary(limit=MAX_REPORTED_ERRORS)}", file=sys.stderr)
+
+    if count == 0:
+        print("No accounts found in input file", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,6 +8,14 @@ class Config:
     def __init__(self):
         self.config_path = get_storage_path("config.json")
         self.auto_lock_minutes = 5  # Default: 5 minutes
+        self.list_renderer = "frames"  # "frames" (widget per visible row) or "canvas" (single canvas)
+        self.storage_backend = "json"  # "json" (single encrypted file) or "sqlite" (encrypted row per account)
+        
+        # Low-power refresh policy: "normal", "slow" or "pause"
+        self.hidden_refresh = "pause"  # While minimized/unmapped
+        self.idle_refresh = "slow"  # While visible but unfocused for idle_after_seconds
+        self.idle_after_seconds = 120
+        self.slow_refresh_seconds = 5  # Tick period for "slow" (and auto-lock checks while paused)
         self.load()
         
         # Create config file with defaults if it doesn't exist
@@ -21,6 +29,12 @@ class Config:
                 with open(self.config_path, 'r') as f:
                     data = json.load(f)
                     self.auto_lock_minutes = data.get('auto_lock_minutes', 5)
+                    self.list_renderer = data.get('list_renderer', "frames")
+                    self.storage_backend = data.get('storage_backend', "json")
+                    self.hidden_refresh = data.get('hidden_refresh', "pause")
+                    self.idle_refresh = data.get('idle_refresh', "slow")
+                    self.idle_after_seconds = data.get('idle_after_seconds', 120)
+                    self.slow_refresh_seconds = data.get('slow_refresh_seconds', 5)
             except Exception:
                 # Use defaults if load fails
                 pass
@@ -29,7 +43,13 @@ class Config:
         """Save configuration to file"""
         try:
             data = {
-                'auto_lock_minutes': self.auto_lock_minutes
+                'auto_lock_minutes': self.auto_lock_minutes,
+                'list_renderer': self.list_renderer,
+                'storage_backend': self.storage_backend,
+                'hidden_refresh': self.hidden_refresh,
+                'idle_refresh': self.idle_refresh,
+                'idle_after_seconds': self.idle_after_seconds,
+                'slow_refresh_seconds': self.slow_refresh_seconds
             }
             with open(self.config_path, 'w') as f:
                 json.dump(data, f, indent=4)
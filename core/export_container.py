@@ -0,0 +1,158 @@
+"""
+Passphrase-encrypted export container (streamed in chunks).
+
+Layout: EXPORT_MAGIC, version byte, 4-byte header length, JSON header
+(Argon2id salt and parameters, nonce prefix), then chunks, each a 4-byte
+length followed by AES-GCM ciphertext of a JSON array of up to
+EXPORT_CHUNK_ACCOUNTS accounts.
+
+Chunk i is encrypted with nonce = prefix (7 bytes) + i (4 bytes) + final
+flag (1 byte) and the whole file header as AAD (STREAM construction), so
+chunks can't be reordered, dropped, truncated or moved between files.
+Only one chunk of plaintext is held in memory at a time.
+"""
+import base64
+import json
+import os
+import struct
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from core.kdf import CURRENT_KDF_PARAMS, derive_key
+from core.secure_memory import secure_wipe_bytes
+
+EXPORT_MAGIC = b"TOTPEXP"
+EXPORT_VERSION = 1
+EXPORT_EXTENSION = ".totpenc"
+EXPORT_CHUNK_ACCOUNTS = 500
+NONCE_PREFIX_SIZE = 7
+# Refuse absurd sizes from a damaged length field
+MAX_HEADER_BYTES = 64 * 1024
+MAX_CHUNK_BYTES = 64 * 1024 * 1024
+# The header is only authenticated after the key is derived: refuse KDF
+# parameters far above the current ones before running Argon2id on them
+MAX_KDF_FACTOR = 4
+
+class ExportFileError(ValueError):
+    """Encrypted export can't be read (wrong passphrase, damaged or truncated file)"""
+    pass
+
+def exportable_account(acc):
+    """Account dict with JSON-safe values (bytearray secrets become str), without the record id"""
+    record = {k: v for k, v in acc.items() if k != 'uid'}
+    secret = record.get('secret')
+    if isinstance(secret, (bytes, bytearray)):
+        record['secret'] = secret.decode('utf-8')
+    return record
+
+def is_encrypted_export(filepath):
+    try:
+        with open(filepath, 'rb') as f:
+            return f.read(len(EXPORT_MAGIC)) == EXPORT_MAGIC
+    except OSError:
+        return False
+
+def _derive_key(passphrase, salt, params):
+    # Same Argon2id as the vault key slots
+    key, _ = derive_key(passphrase, salt, params['iterations'], params['memory_cost'], params['lanes'])
+    return key
+
+def _nonce(prefix, index, final):
+    return prefix + struct.pack(">I", index) + (b"\x01" if final else b"\x00")
+
+def write_encrypted_export(accounts, f, passphrase, chunk_accounts=EXPORT_CHUNK_ACCOUNTS):
+    """Encrypt accounts into the binary file object f, one chunk at a time"""
+    salt = os.urandom(16)
+    prefix = os.urandom(NONCE_PREFIX_SIZE)
+    header = json.dumps({
+        "kdf": "argon2id",
+        "salt": base64.b64encode(salt).decode(),
+        "kdf_params": dict(CURRENT_KDF_PARAMS),
+        "nonce_prefix": base64.b64encode(prefix).decode()
+    }).encode()
+    head = EXPORT_MAGIC + bytes([EXPORT_VERSION]) + struct.pack(">I", len(header)) + header
+
+    key = _derive_key(passphrase, salt, CURRENT_KDF_PARAMS)
+    try:
+        aesgcm = AESGCM(bytes(key))
+    finally:
+        secure_wipe_bytes(key)
+
+    f.write(head)
+    # An empty export still has its (final) chunk
+    starts = range(0, len(accounts), chunk_accounts) if accounts else [0]
+    for index, start in enumerate(starts):
+        final = start + chunk_accounts >= len(accounts)
+        chunk = [exportable_account(acc) for acc in accounts[start:start + chunk_accounts]]
+        plaintext = json.dumps(chunk).encode()
+        ciphertext = aesgcm.encrypt(_nonce(prefix, index, final), plaintext, head)
+        f.write(struct.pack(">I", len(ciphertext)))
+        f.write(ciphertext)
+
+def iter_encrypted_records(f, passphrase):
+    """
+    Yield the account records of an encrypted export from the binary file
+    object f, decrypting one chunk at a time.
+    Raises ExportFileError for a wrong passphrase or a damaged file.
+    """
+    fixed = f.read(len(EXPORT_MAGIC) + 5)
+    if len(fixed) < len(EXPORT_MAGIC) + 5 or fixed[:len(EXPORT_MAGIC)] != EXPORT_MAGIC:
+        raise ExportFileError("Not an encrypted export")
+    if fixed[len(EXPORT_MAGIC)] != EXPORT_VERSION:
+        raise ExportFileError("Unsupported export version")
+    header_len = struct.unpack(">I", fixed[-4:])[0]
+    if header_len > MAX_HEADER_BYTES:
+        raise ExportFileError("Damaged export header")
+    header_bytes = f.read(header_len)
+    head = fixed + header_bytes
+    try:
+        header = json.loads(header_bytes.decode())
+        salt = base64.b64decode(header['salt'])
+        prefix = base64.b64decode(header['nonce_prefix'])
+        params = {k: int(header['kdf_params'][k]) for k in ('iterations', 'memory_cost', 'lanes')}
+    except Exception:
+        raise ExportFileError("Damaged export header")
+    if (any(not 1 <= params[k] <= MAX_KDF_FACTOR * CURRENT_KDF_PARAMS[k] for k in params)
+            or params['memory_cost'] < 8 * params['lanes']
+            or len(salt) < 8 or len(prefix) != NONCE_PREFIX_SIZE):
+        raise ExportFileError("Damaged export header")
+
+    key = _derive_key(passphrase, salt, params)
+    try:
+        aesgcm = AESGCM(bytes(key))
+    finally:
+        secure_wipe_bytes(key)
+
+    index = 0
+    while True:
+        size = f.read(4)
+        if len(size) < 4:
+            raise ExportFileError("Export file is truncated")
+        size = struct.unpack(">I", size)[0]
+        if size > MAX_CHUNK_BYTES:
+            raise ExportFileError("Export file is damaged")
+        ciphertext = f.read(size)
+        if len(ciphertext) < size:
+            raise ExportFileError("Export file is truncated")
+
+        # Every chunk but the last is tried as non-final first
+        plaintext = None
+        for final in (False, True):
+            try:
+                plaintext = aesgcm.decrypt(_nonce(prefix, index, final), ciphertext, head)
+                break
+            except InvalidTag:
+                continue
+        if plaintext is None:
+            if index == 0:
+                raise ExportFileError("Wrong passphrase or damaged file")
+            raise ExportFileError("Export file is damaged")
+
+        records = json.loads(plaintext.decode())
+        for record in records:
+            yield record
+
+        if final:
+            if f.read(1):
+                raise ExportFileError("Unexpected data after the end of the export")
+            return
+        index += 1
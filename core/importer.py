@@ -0,0 +1,305 @@
+"""
+Streaming import of account exports (JSON array, CSV or encrypted export)
+and of text files with one otpauth:// or otpauth-migration:// URI per line.
+
+Files are parsed incrementally and validated accounts are handed out in
+chunks, so memory stays flat however large the input is. Rejected rows
+are reported with their row number. ImportJob runs an import on a
+background thread for the UI, with progress and cancel.
+"""
+import codecs
+import csv
+import io
+import json
+import locale
+import os
+import queue
+import re
+import threading
+
+from core.otp import normalize_base32
+from core.otpauth import parse_otpauth
+from core.export_container import EXPORT_MAGIC, ExportFileError, iter_encrypted_records
+
+# Accounts per chunk handed to the consumer
+IMPORT_CHUNK_SIZE = 500
+# Characters read from the file per step
+READ_SIZE = 64 * 1024
+# Rejected rows kept for the report (the rest are only counted)
+MAX_REPORTED_ERRORS = 1000
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+def validate_account(acc):
+    """
+    Normalize one imported record into an account dict.
+    Raises ValueError saying why the record can't be imported.
+    """
+    if not isinstance(acc, dict):
+        raise ValueError("Not an account record")
+    if not acc.get('name'):
+        raise ValueError("Missing name")
+    secret = acc.get('secret')
+    if not secret:
+        raise ValueError("Missing secret")
+
+    # Record ids belong to the vault the file came from
+    acc.pop('uid', None)
+
+    # Convert types (CSV gives strings, missing columns give None)
+    digits = acc.get('digits')
+    interval = acc.get('interval')
+    if type(digits) is not int or type(interval) is not int:
+        try:
+            digits = int(digits or 6)
+            interval = int(interval or 30)
+        except (TypeError, ValueError):
+            digits = 6
+            interval = 30
+        acc['digits'] = digits
+        acc['interval'] = interval
+    if not 1 <= digits <= 9:
+        raise ValueError("Digits must be 1-9")
+    if interval < 1:
+        raise ValueError("Period must be at least 1 second")
+    if not acc.get('algorithm'):
+        acc['algorithm'] = 'SHA1'
+
+    # Canonical base32, same representation as accounts loaded from the vault
+    acc['secret'] = bytearray(normalize_base32(secret))
+    return acc
+
+def validate_records(records):
+    """
+    Validate a chunk of (row, record) pairs. A record can also be an
+    otpauth URI string, which may hold several accounts.
+    Returns (valid, errors): (row, account) and (row, reason) pairs.
+    """
+    valid = []
+    errors = []
+    for row, record in records:
+        try:
+            accounts = parse_otpauth(record) if isinstance(record, str) else [record]
+        except ValueError as e:
+            errors.append((row, str(e)))
+            continue
+
+        for acc in accounts:
+            try:
+                if isinstance(acc, ValueError):
+                    raise acc
+                valid.append((row, validate_account(acc)))
+            except ValueError as e:
+                errors.append((row, str(e)))
+    return valid, errors
+
+class ImportReport:
+    """Rows rejected during an import (the first MAX_REPORTED_ERRORS are kept)"""
+    def __init__(self):
+        self.errors = []
+        self.count = 0
+
+    def add(self, errors):
+        self.count += len(errors)
+        room = MAX_REPORTED_ERRORS - len(self.errors)
+        if room > 0:
+            self.errors.extend(errors[:room])
+
+    def summary(self, limit=10):
+        lines = [f"Row {row}: {reason}" for row, reason in self.errors[:limit]]
+        if self.count > limit:
+            lines.append(f"... and {self.count - limit} more")
+        return "\n".join(lines)
+
+def iter_json_array(f, read_size=READ_SIZE):
+    """
+    Yield the elements of a top-level JSON array one at a time, reading
+    the file incrementally (json.JSONDecoder.raw_decode on a sliding buffer).
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill():
+        nonlocal buf, pos, eof
+        # Drop what was consumed so the buffer only holds unparsed text
+        data = f.read(read_size)
+        buf = buf[pos:] + data
+        pos = 0
+        eof = not data
+
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            pos = WHITESPACE.match(buf, pos).end()
+            if pos < len(buf) or eof:
+                return
+            fill()
+
+    fill()
+    skip_whitespace()
+    if pos >= len(buf) or buf[pos] != "[":
+        raise ValueError("Not a JSON array")
+    pos += 1
+
+    first = True
+    while True:
+        skip_whitespace()
+        if pos >= len(buf):
+            raise ValueError("Unterminated JSON array")
+        if buf[pos] == "]":
+            return
+        if not first:
+            if buf[pos] != ",":
+                raise ValueError("Expected ',' in JSON array")
+            pos += 1
+            skip_whitespace()
+        first = False
+
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                fill()
+                continue
+            # A value running into the end of the buffer may be cut short
+            if end == len(buf) and not eof:
+                fill()
+                continue
+            break
+        pos = end
+        yield value
+
+def iter_uri_lines(f):
+    """Yield (line number, URI) for the non-blank lines of a URI list"""
+    for line_number, line in enumerate(f, 1):
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield line_number, line
+
+def detect_encoding(raw):
+    """
+    Text encoding of a binary file object: UTF-8 (with or without BOM) if
+    the whole file decodes as UTF-8, otherwise the locale's encoding, which
+    older exports on Windows and CSVs saved by Excel use. Reads the file
+    once in blocks and rewinds it.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        while True:
+            block = raw.read(READ_SIZE)
+            decoder.decode(block, final=not block)
+            if not block:
+                return 'utf-8-sig'
+    except UnicodeDecodeError:
+        return locale.getpreferredencoding(False)
+    finally:
+        raw.seek(0)
+
+def _iter_records(raw, passphrase=None):
+    """
+    (row, record) pairs of an encrypted export, JSON array, CSV file or
+    URI list (binary file object), detected from the first bytes / first
+    non-blank character. Rows count from 1 (lines, for URI lists).
+    """
+    encrypted = raw.read(len(EXPORT_MAGIC)) == EXPORT_MAGIC
+    raw.seek(0)
+    if encrypted:
+        if not passphrase:
+            raise ExportFileError("Passphrase required")
+        return enumerate(iter_encrypted_records(raw, passphrase), 1)
+
+    f = io.TextIOWrapper(raw, encoding=detect_encoding(raw), newline='')
+    head = f.read(READ_SIZE).lstrip()
+    f.seek(0)
+    if head.startswith('['):
+        return enumerate(iter_json_array(f), 1)
+    if head[:7].lower() == 'otpauth':
+        return iter_uri_lines(f)
+    return enumerate(csv.DictReader(f), 1)
+
+def iter_import_file(filepath, passphrase=None):
+    """Yield validated accounts from an export file (invalid rows are skipped)"""
+    with open(filepath, 'rb') as raw:
+        for row, record in _iter_records(raw, passphrase):
+            valid, _ = validate_records([(row, record)])
+            for _, acc in valid:
+                yield acc
+
+def iter_record_chunks(filepath, chunk_size=IMPORT_CHUNK_SIZE, passphrase=None):
+    """
+    Yield (records, fraction_done) chunks of unvalidated (row, record)
+    pairs. See validate_records.
+    """
+    total = os.path.getsize(filepath) or 1
+    with open(filepath, 'rb') as raw:
+        chunk = []
+        for row, record in _iter_records(raw, passphrase):
+            chunk.append((row, record))
+            if len(chunk) >= chunk_size:
+                # Bytes read from disk so far (the text layer reads ahead a little)
+                yield chunk, min(raw.tell() / total, 1.0)
+                chunk = []
+        if chunk:
+            yield chunk, 1.0
+
+def iter_import_chunks(filepath, chunk_size=IMPORT_CHUNK_SIZE, passphrase=None):
+    """Yield (accounts, errors, fraction_done) chunks from an export file"""
+    for records, fraction in iter_record_chunks(filepath, chunk_size, passphrase):
+        valid, errors = validate_records(records)
+        yield [acc for _, acc in valid], errors, fraction
+
+class ImportJob:
+    """
+    Streaming import on a background thread.
+    The UI calls poll() from its event loop and gets
+    ("chunk", (accounts, errors), fraction), ("done", None, 1.0) or
+    ("error", exception, None) messages. Validation runs on this thread
+    too; it is a few percent of the parse time. The queue is bounded, so the reader never runs far ahead.
+    """
+    def __init__(self, filepath, chunk_size=IMPORT_CHUNK_SIZE, passphrase=None):
+        self.filepath = filepath
+        self.chunk_size = chunk_size
+        self.passphrase = passphrase
+        self.messages = queue.Queue(maxsize=4)
+        self.cancelled = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="import", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def cancel(self):
+        """Stop reading; chunks not yet polled are dropped"""
+        self.cancelled.set()
+        self.poll()
+
+    def poll(self):
+        """Return all messages available right now (never blocks)"""
+        messages = []
+        while True:
+            try:
+                messages.append(self.messages.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def _put(self, message):
+        # Wait for room, but give up as soon as the import is cancelled
+        while not self.cancelled.is_set():
+            try:
+                self.messages.put(message, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _run(self):
+        try:
+            for accounts, errors, fraction in iter_import_chunks(self.filepath, self.chunk_size, self.passphrase):
+                if not self._put(("chunk", (accounts, errors), fraction)):
+                    return
+            self._put(("done", None, 1.0))
+        except Exception as e:
+            self._put(("error", e, None))
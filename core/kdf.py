@@ -0,0 +1,40 @@
+import os
+from cryptography.hazmat.primitives.kdf.argon2 import Argon2id
+
+# Current Argon2id parameters (older vaults are upgraded on their next save)
+KDF_ITERATIONS = 6
+KDF_MEMORY_COST = 65536
+KDF_LANES = 4
+CURRENT_KDF_PARAMS = {
+    "iterations": KDF_ITERATIONS,
+    "memory_cost": KDF_MEMORY_COST,
+    "lanes": KDF_LANES
+}
+
+def derive_key(password, salt=None, iterations=KDF_ITERATIONS, memory_cost=KDF_MEMORY_COST, lanes=KDF_LANES):
+    """
+    Derives a 32-byte AES-256 key from the password using Argon2id.
+    If salt is None, generates a new 16-byte salt.
+    Returns (key, salt)
+    """
+    if salt is None:
+        salt = os.urandom(16)
+    
+    # Argon2id parameters
+    kdf = Argon2id(
+        salt=salt,
+        length=32,
+        iterations=iterations,
+        lanes=lanes,
+        memory_cost=memory_cost,
+        ad=None,
+        secret=None
+    )
+    
+    if isinstance(password, (bytes, bytearray)):
+        password_bytes = password
+    else:
+        password_bytes = password.encode()
+        
+    key = bytearray(kdf.derive(password_bytes))
+    return key, salt
@@ -1,31 +1,232 @@
 import pyotp
+import base64
+import hashlib
+import hmac
+import struct
 import time
 
+from core.secure_memory import secure_wipe_bytes
+
+# NumPy is optional: it vectorizes batch truncation when available
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Below this many codes per digest group the NumPy setup costs more than it saves
+NUMPY_MIN_BATCH = 32
+
+# Map algorithm names to hashlib constructors
+DIGESTS = {
+    'SHA1': hashlib.sha1,
+    'SHA256': hashlib.sha256,
+    'SHA512': hashlib.sha512
+}
+
+def resolve_digest(algorithm):
+    """Resolve 'SHA1' / 'SHA-256' / 'sha512' style names to a hashlib constructor (default SHA1)"""
+    return DIGESTS.get(str(algorithm).upper().replace('-', ''), hashlib.sha1)
+
+BASE32_ALPHABET = b"ABCDEFGHIJKLMNOPQRSTUVWXYZ234567"
+# Lengths (mod 8) a base32 string can have without padding (RFC 4648 section 6)
+BASE32_VALID_REMAINDERS = (0, 2, 4, 5, 7)
+# One translate() call uppercases and drops whitespace
+_BASE32_UPPER = bytes.maketrans(b"abcdefghijklmnopqrstuvwxyz", b"ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+_BASE32_IGNORED = b" \t\r\n"
+
+def normalize_base32(secret):
+    """
+    Check a base32 secret without decoding it or computing a code
+    (alphabet, padding and length) and return it in canonical form:
+    uppercase bytes without whitespace or padding. Accepts what pyotp
+    accepts, except an empty secret.
+    Raises ValueError describing the problem.
+    """
+    if isinstance(secret, str):
+        secret = secret.encode('utf-8')
+    
+    canonical = secret.translate(_BASE32_UPPER, _BASE32_IGNORED)
+    data = canonical.rstrip(b"=")
+    
+    if not data:
+        raise ValueError("Secret is empty")
+    # Deleting every alphabet character leaves only the invalid ones
+    if data.translate(None, BASE32_ALPHABET):
+        raise ValueError("Secret contains characters outside base32 (A-Z, 2-7)")
+    if len(data) % 8 not in BASE32_VALID_REMAINDERS:
+        raise ValueError("Secret has an invalid length for base32")
+    # Padding may be partial (it is completed when decoding), never too long
+    if len(canonical) - len(data) > (-len(data)) % 8:
+        raise ValueError("Secret has incorrect padding")
+    return bytes(data)
+
+def decode_secret(secret):
+    """
+    Decode a base32 secret (str, bytes or bytearray) into raw key bytes.
+    Missing padding is added and lowercase is accepted, matching pyotp.
+    Returns a bytearray so the key can be wiped later.
+    """
+    if isinstance(secret, str):
+        secret = secret.encode('utf-8')
+    
+    padded = bytearray(secret)
+    missing_padding = len(padded) % 8
+    if missing_padding != 0:
+        padded += b"=" * (8 - missing_padding)
+    
+    try:
+        return bytearray(base64.b32decode(bytes(padded), casefold=True))
+    finally:
+        secure_wipe_bytes(padded)
+
+def truncate_many(hmac_hashes, moduli):
+    """
+    Apply RFC 4226 dynamic truncation and the modulo step to many HMAC
+    results of the same digest size. Returns a list of ints.
+    Vectorized with NumPy when available, pure Python otherwise.
+    """
+    if np is not None and len(hmac_hashes) >= NUMPY_MIN_BATCH:
+        digest_size = len(hmac_hashes[0])
+        data = np.frombuffer(b"".join(hmac_hashes), dtype=np.uint8).reshape(-1, digest_size)
+        
+        rows = np.arange(len(hmac_hashes))
+        offsets = (data[:, -1] & 0x0F).astype(np.intp)
+        
+        value = (data[rows, offsets].astype(np.int64) & 0x7F) << 24
+        value |= data[rows, offsets + 1].astype(np.int64) << 16
+        value |= data[rows, offsets + 2].astype(np.int64) << 8
+        value |= data[rows, offsets + 3].astype(np.int64)
+        
+        return (value % np.asarray(moduli, dtype=np.int64)).tolist()
+    
+    values = []
+    for hmac_hash, modulus in zip(hmac_hashes, moduli):
+        offset = hmac_hash[-1] & 0x0F
+        values.append((struct.unpack_from(">I", hmac_hash, offset)[0] & 0x7FFFFFFF) % modulus)
+    return values
+
+class OTPKey:
+    """
+    Compiled TOTP key for one account.
+    
+    Holds the decoded key bytes, the resolved digest constructor and a
+    pre-keyed HMAC state that is cloned for each time step, so producing
+    a code needs no base32 parsing or pyotp objects. The last code is kept
+    until the time step changes.
+    """
+    __slots__ = ('digits', 'interval', 'algorithm', 'key', 'digest', '_hmac', '_modulus', 'time_step', 'code')
+    
+    def __init__(self, secret, digits=6, interval=30, algorithm='SHA1'):
+        self.digits = digits
+        self.interval = interval
+        self.algorithm = algorithm
+        self.key = decode_secret(secret)
+        self.digest = resolve_digest(algorithm)
+        self._hmac = hmac.new(self.key, digestmod=self.digest)
+        self._modulus = 10 ** digits
+        self.time_step = None
+        self.code = None
+
+    def at(self, time_step):
+        """Return the code for a given time step (counter)"""
+        if time_step == self.time_step:
+            return self.code
+        
+        mac = self._hmac.copy()
+        mac.update(struct.pack(">Q", time_step))
+        hmac_hash = mac.digest()
+        
+        # Dynamic truncation (RFC 4226 section 5.3)
+        offset = hmac_hash[-1] & 0x0F
+        value = struct.unpack_from(">I", hmac_hash, offset)[0] & 0x7FFFFFFF
+        code = str(value % self._modulus).zfill(self.digits)
+        
+        self.time_step = time_step
+        self.code = code
+        return code
+
+    def at_time(self, for_time):
+        """Return the code for a unix timestamp"""
+        return self.at(int(for_time) // self.interval)
+
+    def now(self):
+        """Return the code for the current time"""
+        return self.at(int(time.time()) // self.interval)
+
+    def wipe(self):
+        """Wipe the decoded key bytes and the cached code"""
+        secure_wipe_bytes(self.key)
+        self._hmac = None
+        self.time_step = None
+        self.code = None
+
 class AuthEngine:
     def __init__(self):
-        pass
+        # Compiled key cache: id(secret) -> (secret, settings, OTPKey or None)
+        # The secret object itself is kept so a recycled id() can never match
+        self._keys = {}
+
+    def compile(self, secret, digits=6, interval=30, algorithm='SHA1'):
+        """
+        Compile (or fetch the already compiled) key for an account.
+        Returns None if the secret is not valid base32.
+        """
+        settings = (digits, interval, algorithm)
+        
+        entry = self._keys.get(id(secret))
+        if entry is not None and entry[0] is secret and entry[1] == settings:
+            return entry[2]
+        
+        # First use or settings changed: replace the old key
+        if entry is not None and entry[2] is not None:
+            entry[2].wipe()
+        
+        try:
+            key = OTPKey(secret, digits=digits, interval=interval, algorithm=algorithm)
+        except Exception:
+            key = None
+        
+        self._keys[id(secret)] = (secret, settings, key)
+        return key
+
+    def compile_account(self, account):
+        """Compile the key for an account dict"""
+        return self.compile(
+            account.get('secret', ''),
+            digits=account.get('digits', 6),
+            interval=account.get('interval', 30),
+            algorithm=account.get('algorithm', 'SHA1')
+        )
+
+    def compile_accounts(self, accounts):
+        """Compile keys for every account (called when the vault is loaded)"""
+        for acc in accounts:
+            self.compile_account(acc)
 
     def generate_totp(self, secret, digits=6, interval=30, algorithm='SHA1'):
         """
         Generate a TOTP code with custom parameters.
         
+        Uses the compiled key for the account, so repeated calls within the
+        same interval only cost a dictionary lookup.
+        
         Args:
             secret: Base32 encoded secret key
             digits: Number of digits in the TOTP code (1-9, default 6)
             interval: Time step in seconds (default 30)
             algorithm: Hash algorithm - 'SHA1', 'SHA256', or 'SHA512' (default 'SHA1')
         """
-        # Map algorithm names to hashlib names
-        algorithm_map = {
-            'SHA1': 'sha1',
-            'SHA-1': 'sha1',
-            'SHA256': 'sha256',
-            'SHA-256': 'sha256',
-            'SHA512': 'sha512',
-            'SHA-512': 'sha512'
-        }
-        
-        digest_name = algorithm_map.get(algorithm.upper().replace('-', ''), 'sha1')
+        key = self.compile(secret, digits=digits, interval=interval, algorithm=algorithm)
+        if key is None:
+            if isinstance(secret, (bytes, bytearray)):
+                return "000000"
+            # Keep pyotp's error for invalid string secrets
+            return self._generate_totp_pyotp(secret, digits, interval, algorithm)
+        return key.now()
+
+    def _generate_totp_pyotp(self, secret, digits=6, interval=30, algorithm='SHA1'):
+        """Reference implementation using pyotp (uncached)"""
+        digest_name = resolve_digest(algorithm)().name
         
         # Ensure secret is string for pyotp (pyotp requires string)
         # We decode only at the last moment to minimize string lifetime
@@ -45,6 +246,66 @@ class AuthEngine:
             totp = pyotp.TOTP(secret, digits=digits, interval=interval, digest=digest_name)
             return totp.now()
 
+    def generate_totp_many(self, items, for_time=None):
+        """
+        Generate codes for many accounts at one timestamp in a single call.
+        
+        Args:
+            items: Account dicts and/or compiled OTPKey objects (None for invalid keys)
+            for_time: Unix timestamp (default: now)
+        
+        Returns:
+            List of codes in the same order as items ("000000" for invalid secrets)
+        """
+        if for_time is None:
+            for_time = time.time()
+        now = int(for_time)
+        
+        codes = [None] * len(items)
+        
+        # Only keys whose time step changed need an HMAC; group those by digest size
+        pending = {}
+        for i, item in enumerate(items):
+            if item is None or isinstance(item, OTPKey):
+                key = item
+            else:
+                key = self.compile_account(item)
+            if key is None:
+                codes[i] = "000000"
+                continue
+            
+            time_step = now // key.interval
+            if time_step == key.time_step:
+                codes[i] = key.code
+                continue
+            
+            mac = key._hmac.copy()
+            mac.update(struct.pack(">Q", time_step))
+            pending.setdefault(mac.digest_size, []).append((i, key, time_step, mac.digest()))
+        
+        for group in pending.values():
+            values = truncate_many([entry[3] for entry in group], [entry[1]._modulus for entry in group])
+            for (i, key, time_step, _), value in zip(group, values):
+                code = str(value).zfill(key.digits)
+                key.time_step = time_step
+                key.code = code
+                codes[i] = code
+        
+        return codes
+
+    def invalidate(self, secret):
+        """Drop the compiled key for one account (e.g. after delete or edit)"""
+        entry = self._keys.pop(id(secret), None)
+        if entry is not None and entry[2] is not None:
+            entry[2].wipe()
+
+    def clear_cache(self):
+        """Drop all compiled keys (e.g. on lock, before secrets are wiped)"""
+        for _, _, key in self._keys.values():
+            if key is not None:
+                key.wipe()
+        self._keys.clear()
+
     def get_remaining_time(self, interval=30):
         """
         Calculate remaining time until next TOTP code.
@@ -58,14 +319,9 @@ class AuthEngine:
         return interval - (int(time.time()) % interval)
 
     def validate_secret(self, secret):
-        """Validate if secret is a valid base32 string"""
+        """Validate if secret is a valid base32 string (no code is computed)"""
         try:
-            if isinstance(secret, (bytes, bytearray)):
-                secret_str = secret.decode('utf-8')
-                pyotp.TOTP(secret_str).now()
-                del secret_str
-            else:
-                pyotp.TOTP(secret).now()
+            normalize_base32(secret)
             return True
-        except Exception:
+        except ValueError:
             return False
@@ -0,0 +1,203 @@
+"""
+Parsing of otpauth:// URIs and otpauth-migration:// batch payloads
+(the QR export of Google Authenticator and compatible apps).
+
+The migration payload is a base64 protobuf message; it is read with the
+small decoder below instead of a protobuf dependency:
+
+    MigrationPayload { repeated OtpParameters otp_parameters = 1; ... }
+    OtpParameters {
+        bytes secret = 1; string name = 2; string issuer = 3;
+        Algorithm algorithm = 4; DigitCount digits = 5; OtpType type = 6;
+    }
+"""
+import base64
+from urllib.parse import unquote
+
+# Enum values of the migration payload
+MIGRATION_ALGORITHMS = {0: 'SHA1', 1: 'SHA1', 2: 'SHA256', 3: 'SHA512'}
+MIGRATION_DIGITS = {0: 6, 1: 6, 2: 8}
+MIGRATION_TYPE_HOTP = 1
+
+SUPPORTED_ALGORITHMS = ('SHA1', 'SHA256', 'SHA512')
+
+def _read_varint(data, pos):
+    result = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError("Truncated migration payload")
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+        if shift > 63:
+            raise ValueError("Invalid migration payload")
+
+def iter_protobuf_fields(data):
+    """Yield (field number, value) of a protobuf message; length-delimited values are bytes"""
+    pos = 0
+    while pos < len(data):
+        key, pos = _read_varint(data, pos)
+        field, wire_type = key >> 3, key & 0x07
+        if wire_type == 0:
+            value, pos = _read_varint(data, pos)
+        elif wire_type in (1, 2, 5):
+            if wire_type == 2:
+                length, pos = _read_varint(data, pos)
+            else:
+                length = 8 if wire_type == 1 else 4
+            value = data[pos:pos + length]
+            if len(value) < length:
+                raise ValueError("Truncated migration payload")
+            pos += length
+        else:
+            raise ValueError("Invalid migration payload")
+        yield field, value
+
+def account_name(issuer, label):
+    """Display name from an issuer and account label, e.g. "GitHub (alice)" """
+    issuer = (issuer or "").strip()
+    label = (label or "").strip()
+    if issuer and label and issuer != label:
+        return f"{issuer} ({label})"
+    return issuer or label
+
+def _split_uri(uri):
+    """
+    (host, label, params) of an otpauth URI, parsed directly (urllib's
+    general parsers dominate bulk import time). Parameter names are
+    lowercased; the first value of a repeated parameter wins.
+    """
+    _, _, rest = uri.partition('://')
+    rest, _, query = rest.partition('?')
+    host, _, path = rest.partition('/')
+
+    params = {}
+    for item in query.split('&'):
+        key, _, value = item.partition('=')
+        key = key.lower()
+        if key and key not in params:
+            params[key] = unquote(value.replace('+', ' ')) if '%' in value or '+' in value else value
+    return host.lower(), unquote(path), params
+
+def parse_otpauth_uri(uri):
+    """Account dict from an otpauth://totp/ URI. Raises ValueError."""
+    host, label, params = _split_uri(uri)
+    if host != 'totp':
+        raise ValueError("Only TOTP accounts are supported")
+
+    secret = params.get('secret')
+    if not secret:
+        raise ValueError("Missing secret")
+
+    # Label is "issuer:account" or just "account"
+    issuer = params.get('issuer')
+    if ':' in label:
+        label_issuer, label = label.split(':', 1)
+        issuer = issuer or label_issuer
+
+    algorithm = (params.get('algorithm') or 'SHA1').upper().replace('-', '')
+    if algorithm not in SUPPORTED_ALGORITHMS:
+        raise ValueError(f"Unsupported algorithm {algorithm}")
+    try:
+        digits = int(params.get('digits') or 6)
+        interval = int(params.get('period') or 30)
+    except ValueError:
+        raise ValueError("Invalid digits or period")
+
+    return {
+        'name': account_name(issuer, label),
+        'secret': secret,
+        'digits': digits,
+        'interval': interval,
+        'algorithm': algorithm
+    }
+
+def _migration_account(data):
+    """Account dict from one OtpParameters message. Raises ValueError."""
+    fields = {}
+    for field, value in iter_protobuf_fields(data):
+        fields[field] = value
+
+    # Wire types must match the schema: bytes/strings for 1-3, enums (varints) for 4-6
+    for field, expected in ((1, bytes), (2, bytes), (3, bytes), (4, int), (5, int), (6, int)):
+        if field in fields and not isinstance(fields[field], expected):
+            raise ValueError("Invalid migration entry")
+
+    if fields.get(6) == MIGRATION_TYPE_HOTP:
+        raise ValueError("Only TOTP accounts are supported")
+    if fields.get(4, 0) not in MIGRATION_ALGORITHMS:
+        raise ValueError("Unsupported algorithm")
+    if fields.get(5, 0) not in MIGRATION_DIGITS:
+        raise ValueError("Unsupported digit count")
+    secret = fields.get(1)
+    if not secret:
+        raise ValueError("Missing secret")
+
+    try:
+        name = fields.get(2, b"").decode('utf-8')
+        issuer = fields.get(3, b"").decode('utf-8')
+    except (AttributeError, UnicodeDecodeError):
+        raise ValueError("Invalid account name")
+    # Names are often "issuer:account" like otpauth labels
+    if ':' in name:
+        label_issuer, label = name.split(':', 1)
+        if not issuer or label_issuer.strip() == issuer.strip():
+            issuer, name = issuer or label_issuer, label
+
+    return {
+        # Raw key bytes in the payload; accounts store base32
+        'name': account_name(issuer, name),
+        'secret': base64.b32encode(secret).rstrip(b"=").decode(),
+        'digits': MIGRATION_DIGITS[fields.get(5, 0)],
+        'interval': 30,
+        'algorithm': MIGRATION_ALGORITHMS[fields.get(4, 0)]
+    }
+
+def parse_migration_uri(uri):
+    """
+    Accounts of an otpauth-migration://offline?data=... URI.
+    Entries that can't be imported are returned as ValueError instances,
+    so the rest of the batch still goes through. Raises ValueError if the
+    payload itself is unreadable.
+    """
+    _, _, params = _split_uri(uri)
+    data = params.get('data')
+    if not data:
+        raise ValueError("Missing migration data")
+
+    try:
+        # An unescaped '+' was read as a space; accept URL-safe base64 too
+        data = data.replace(' ', '+').replace('-', '+').replace('_', '/')
+        payload = base64.b64decode(data + "=" * (-len(data) % 4), validate=True)
+    except ValueError:
+        raise ValueError("Invalid migration data")
+
+    accounts = []
+    for field, value in iter_protobuf_fields(payload):
+        if field != 1:
+            continue # version / batch info
+        if not isinstance(value, bytes):
+            raise ValueError("Invalid migration payload")
+        try:
+            accounts.append(_migration_account(value))
+        except ValueError as e:
+            accounts.append(e)
+    return accounts
+
+def parse_otpauth(uri):
+    """
+    Accounts in an otpauth:// or otpauth-migration:// URI, as a list of
+    account dicts (see parse_migration_uri for entries that failed).
+    Raises ValueError if the URI can't be read at all.
+    """
+    uri = uri.strip()
+    scheme = uri.split(':', 1)[0].lower()
+    if scheme == 'otpauth':
+        return [parse_otpauth_uri(uri)]
+    if scheme == 'otpauth-migration':
+        return parse_migration_uri(uri)
+    raise ValueError("Not an otpauth URI")
@@ -0,0 +1,99 @@
+import atexit
+import threading
+from core.storage import ensure_uids
+
+# Quiet period after the last edit before the vault is written
+DEFAULT_SAVE_DELAY = 0.5
+
+class SaveQueue:
+    """
+    Write-behind layer in front of Storage.
+    Edits only mark the vault dirty; a burst of edits (e.g. moving an account
+    ten places) is merged into a single encrypt-and-write once no new edit
+    has arrived for `delay` seconds. Writes run on the storage worker.
+    """
+    def __init__(self, storage, delay=DEFAULT_SAVE_DELAY):
+        self.storage = storage
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._pending = None # (accounts snapshot, password) of the latest edit
+        self._timer = None
+        # While held (secrets still loading), edits are only remembered
+        self._held = False
+        self._held_edit = None # (accounts, password), snapshotted on release
+
+        # Last-chance flush if the process exits without going through the UI
+        atexit.register(self.flush)
+
+    def mark_dirty(self, accounts, password):
+        """
+        Record the current account list as needing a save.
+        The list is snapshotted here so later edits can't race with the write.
+        """
+        if self._held:
+            self._held_edit = (accounts, password)
+            return
+        
+        ensure_uids(accounts)
+        snapshot = [acc.copy() for acc in accounts]
+        with self._lock:
+            self._pending = (snapshot, password)
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self._submit_pending)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def hold(self):
+        """
+        Stop snapshotting edits until release(), e.g. while a progressive
+        unlock is still filling in the secrets of the account dicts.
+        """
+        self._held = True
+        self._held_edit = None
+
+    def release(self, discard=False):
+        """Resume normal saving and queue any edit made while held"""
+        held_edit = self._held_edit
+        self._held = False
+        self._held_edit = None
+        if held_edit is not None and not discard:
+            self.mark_dirty(*held_edit)
+
+    def is_dirty(self):
+        """True if an edit has not been handed to the storage worker yet"""
+        return self._pending is not None or self._held_edit is not None
+
+    def _submit_pending(self):
+        """Hand the latest snapshot to the storage worker, if there is one"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+            pending = self._pending
+            self._pending = None
+            if pending is None:
+                return
+
+            # Submitted under the lock so flush() can't overtake a save in progress
+            try:
+                self.storage.submit(self.storage.save_accounts, *pending)
+            except RuntimeError:
+                # Worker already shut down (interpreter exit): write inline
+                self.storage.save_accounts(*pending)
+
+    def flush(self):
+        """Write any pending edit now and wait until all saves are on disk"""
+        if self._held and self._held_edit is not None:
+            # The secrets load is queued on the storage worker ahead of us
+            try:
+                self.storage.wait_idle()
+            except RuntimeError:
+                pass
+            self.release()
+        self._submit_pending()
+        try:
+            self.storage.wait_idle()
+        except RuntimeError:
+            pass
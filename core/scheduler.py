@@ -0,0 +1,48 @@
+import time
+
+class BoundaryScheduler:
+    """
+    Groups accounts by interval and tracks the next time-step boundary of
+    each group, so codes are only regenerated when their window rolls over.
+    The scheduler only does the bookkeeping; the UI arms its own timer for
+    next_boundary() and calls pop_due() when it fires.
+    """
+    def __init__(self):
+        self.next_boundaries = {} # interval -> unix time of the group's next boundary
+
+    def set_intervals(self, intervals, now=None):
+        """Set the interval groups in use (e.g. after the account list changed)"""
+        if now is None:
+            now = time.time()
+
+        intervals = set(intervals)
+        # Keep existing groups so their pending boundary is not lost
+        self.next_boundaries = {
+            interval: self.next_boundaries.get(interval, self.get_next_boundary(interval, now))
+            for interval in intervals
+        }
+
+    def get_next_boundary(self, interval, now):
+        """First time-step boundary strictly after now"""
+        return (int(now) // interval + 1) * interval
+
+    def next_boundary(self):
+        """Earliest pending boundary over all groups, or None if there are no groups"""
+        if not self.next_boundaries:
+            return None
+        return min(self.next_boundaries.values())
+
+    def pop_due(self, now=None):
+        """
+        Return the intervals whose boundary has passed and advance them to
+        their next boundary.
+        """
+        if now is None:
+            now = time.time()
+
+        due = []
+        for interval, boundary in self.next_boundaries.items():
+            if now >= boundary:
+                due.append(interval)
+                self.next_boundaries[interval] = self.get_next_boundary(interval, now)
+        return due
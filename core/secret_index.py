@@ -0,0 +1,70 @@
+import hashlib
+import os
+from core.otp import normalize_base32
+from core.secure_memory import secure_wipe_bytes
+
+def canonical_secret(secret):
+    """
+    Canonical form of a secret for comparison (see core.otp.normalize_base32).
+    Secrets that are not valid base32 are compared as stored.
+    """
+    try:
+        return normalize_base32(secret)
+    except ValueError:
+        return secret.encode('utf-8') if isinstance(secret, str) else bytes(secret)
+
+class SecretIndex:
+    """
+    Set of the secrets in the unlocked vault, for constant-time duplicate checks.
+
+    Holds keyed digests (BLAKE2b keyed with a random per-session key) of the
+    normalized secrets rather than the secrets themselves, with a count per
+    digest so a vault that already contains duplicates stays consistent
+    when one of them is deleted.
+    """
+    def __init__(self):
+        self._key = bytearray(os.urandom(32))
+        self._counts = {}
+
+    def _digest(self, secret):
+        return hashlib.blake2b(canonical_secret(secret), key=self._key, digest_size=16).digest()
+
+    def __contains__(self, secret):
+        return self._digest(secret) in self._counts
+
+    def __len__(self):
+        return sum(self._counts.values())
+
+    def add(self, secret):
+        digest = self._digest(secret)
+        self._counts[digest] = self._counts.get(digest, 0) + 1
+
+    def add_new(self, secret):
+        """Add secret unless it is already present. Returns True if it was added."""
+        digest = self._digest(secret)
+        if digest in self._counts:
+            return False
+        self._counts[digest] = 1
+        return True
+
+    def remove(self, secret):
+        digest = self._digest(secret)
+        count = self._counts.get(digest, 0)
+        if count > 1:
+            self._counts[digest] = count - 1
+        else:
+            self._counts.pop(digest, None)
+
+    def rebuild(self, accounts):
+        """Index every account that has its secret loaded"""
+        self._counts = {}
+        for acc in accounts:
+            secret = acc.get('secret')
+            if secret:
+                self.add(secret)
+
+    def clear(self):
+        """Forget all digests and switch to a fresh key (on lock)"""
+        secure_wipe_bytes(self._key)
+        self._key = bytearray(os.urandom(32))
+        self._counts = {}
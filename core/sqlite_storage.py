@@ -0,0 +1,322 @@
+import json
+import os
+import sqlite3
+from bisect import bisect_left
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from core.storage import Storage, ensure_uids
+
+# Each account is bound to its record id, so encrypted rows can't be swapped
+ACCOUNT_META_AAD = b"TOTP-Authenticator account metadata:"
+ACCOUNT_SECRET_AAD = b"TOTP-Authenticator account secret:"
+SQLITE_VAULT_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS vault (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS accounts (
+    uid TEXT PRIMARY KEY,
+    position REAL NOT NULL,
+    meta_nonce BLOB NOT NULL,
+    meta BLOB NOT NULL,
+    secret_nonce BLOB NOT NULL,
+    secret BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS accounts_position ON accounts(position);
+"""
+
+def _longest_increasing(indexes, values):
+    """Longest run of indexes (in order) whose values strictly increase (patience sorting)"""
+    tails = [] # tails[k]: smallest tail value of an increasing run of length k+1
+    tail_index = [] # index of that tail
+    previous = {}
+    for i in indexes:
+        k = bisect_left(tails, values[i])
+        previous[i] = tail_index[k - 1] if k > 0 else None
+        if k == len(tails):
+            tails.append(values[i])
+            tail_index.append(i)
+        else:
+            tails[k] = values[i]
+            tail_index[k] = i
+
+    run = []
+    i = tail_index[-1] if tail_index else None
+    while i is not None:
+        run.append(i)
+        i = previous[i]
+    run.reverse()
+    return run
+
+def plan_positions(old_positions):
+    """
+    Pick sort positions for a reordered list while moving as few rows as possible.
+
+    Args:
+        old_positions: stored position of each account in the new order
+            (None for accounts that are not stored yet)
+    Returns:
+        New positions, strictly increasing. Rows on a longest increasing
+        run of old positions keep theirs; the rest are placed in the gaps.
+    """
+    n = len(old_positions)
+    stored = [i for i, pos in enumerate(old_positions) if pos is not None]
+    descents = [k for k in range(1, len(stored)) if old_positions[stored[k]] <= old_positions[stored[k - 1]]]
+
+    if not descents:
+        keep = stored
+    else:
+        # Edits only disturb the order between the first and last descent;
+        # search for the longest run there, between the untouched ends
+        prefix = stored[:descents[0] - 1]
+        window = stored[descents[0] - 1:descents[-1] + 1]
+        suffix = stored[descents[-1] + 1:]
+        low = old_positions[prefix[-1]] if prefix else float("-inf")
+        high = old_positions[suffix[0]] if suffix else float("inf")
+        if low < high:
+            window = [i for i in window if low < old_positions[i] < high]
+            keep = prefix + _longest_increasing(window, old_positions) + suffix
+        else:
+            keep = _longest_increasing(stored, old_positions)
+
+    positions = [None] * n
+    for i in keep:
+        positions[i] = old_positions[i]
+
+    # Place everything else evenly in the gap between its kept neighbours
+    i = 0
+    while i < n:
+        if positions[i] is not None:
+            i += 1
+            continue
+        j = i
+        while j < n and positions[j] is None:
+            j += 1
+        before = positions[i - 1] if i > 0 else None
+        after = positions[j] if j < n else None
+        count = j - i
+        for k in range(count):
+            if before is None and after is None:
+                positions[i + k] = float(k)
+            elif before is None:
+                positions[i + k] = after - (count - k)
+            elif after is None:
+                positions[i + k] = before + k + 1
+            else:
+                positions[i + k] = before + (after - before) * (k + 1) / (count + 1)
+        i = j
+
+    # Out of float precision between two neighbours: renumber everything
+    if any(a >= b for a, b in zip(positions, positions[1:])):
+        return [float(i) for i in range(n)]
+    return positions
+
+class SQLiteStorage(Storage):
+    """
+    Vault backend that keeps each account in its own encrypted SQLite row.
+
+    Uses the same key slots and data key as Storage, but metadata and
+    secret of every account are encrypted separately per row (AAD bound to
+    the account's uid), and rows are ordered by an indexed position column.
+    Saves diff the account list against what is stored, so an edit only
+    encrypts and writes the rows it touched.
+    """
+    def __init__(self, filepath="accounts.db", legacy_path=None):
+        super().__init__(filepath)
+        # JSON vault to migrate from on first unlock
+        self.legacy_path = legacy_path
+        self._conn = None
+        # Stored state per account: uid -> [position, account dict as stored].
+        # Compared against on save, so unchanged rows cost one dict comparison
+        # and no serialization. Shares the secret object with the live account
+        # dict (wiped with it on lock).
+        self._rows = {}
+
+    def exists(self):
+        return os.path.exists(self.filepath) or bool(self.legacy_path and os.path.exists(self.legacy_path))
+
+    def _connect(self):
+        if self._conn is None:
+            # Only used from one thread at a time (the storage worker)
+            self._conn = sqlite3.connect(self.filepath, check_same_thread=False)
+            self._conn.execute("PRAGMA synchronous=FULL")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def _close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _set_session(self, key, slots, slot_index=0):
+        super()._set_session(key, slots, slot_index)
+        self._rows = {}
+
+    def lock(self):
+        super().lock()
+        self._rows = {}
+        self._close()
+
+    def unlock_metadata(self, password):
+        if not os.path.exists(self.filepath):
+            if self.legacy_path and os.path.exists(self.legacy_path):
+                return self._migrate_from_json(password)
+            # New vault, just derive a key to be ready (using new defaults)
+            self._new_vault_session(password)
+            return []
+
+        try:
+            conn = self._connect()
+            row = conn.execute("SELECT value FROM vault WHERE key = 'slots'").fetchone()
+            slots = json.loads(row[0])
+
+            dek, slot_index = self._open_slots(slots, password)
+            if dek is None:
+                return None
+            self._set_session(dek, slots, slot_index)
+
+            aesgcm = AESGCM(bytes(self.key))
+            accounts = []
+            for uid, position, nonce, data in conn.execute("SELECT uid, position, meta_nonce, meta FROM accounts ORDER BY position"):
+                meta_json = aesgcm.decrypt(nonce, data, ACCOUNT_META_AAD + uid.encode())
+                acc = json.loads(meta_json.decode())
+                acc['uid'] = uid
+                accounts.append(acc)
+                self._rows[uid] = [position, acc.copy()]
+
+            if accounts:
+                self._pending_secrets = (list(accounts), None)
+            return accounts
+        except Exception:
+            # Authentication failed (or unreadable database)
+            self.lock()
+            return None
+
+    def load_secrets(self):
+        if self._pending_secrets is None:
+            return True
+
+        accounts, _ = self._pending_secrets
+        try:
+            aesgcm = AESGCM(bytes(self.key))
+            rows = {uid: (nonce, data) for uid, nonce, data in self._connect().execute("SELECT uid, secret_nonce, secret FROM accounts")}
+            for acc in accounts:
+                uid = acc['uid']
+                nonce, data = rows[uid]
+                # Convert secrets to bytearrays immediately for mutable memory
+                acc['secret'] = bytearray(aesgcm.decrypt(nonce, data, ACCOUNT_SECRET_AAD + uid.encode()))
+                self._rows[uid][1]['secret'] = acc['secret']
+        except Exception:
+            return False
+
+        self._pending_secrets = None
+        return True
+
+    def _migrate_from_json(self, password):
+        """
+        Unlock the JSON vault and move its accounts into the database.
+        The data key and key slots are carried over, so no extra KDF runs.
+        The JSON file is kept next to it with a .migrated suffix.
+        """
+        legacy = Storage(filepath=self.legacy_path)
+        accounts = legacy.unlock_and_load(password)
+        if accounts is None:
+            return None
+
+        self._set_session(bytearray(legacy.key), legacy.slots, legacy.slot_index)
+        legacy.lock()
+        ensure_uids(accounts)
+        self._header_dirty = True
+
+        if not self._write_accounts(accounts):
+            self.lock()
+            try:
+                os.remove(self.filepath)
+            except OSError:
+                pass
+            return None
+
+        try:
+            os.replace(self.legacy_path, self.legacy_path + ".migrated")
+        except OSError:
+            pass
+        return accounts
+
+    def _write_accounts(self, accounts):
+        """Write only the rows that were added, changed, moved or deleted since the last save"""
+        try:
+            # Never overwrite the vault while secrets are still being loaded
+            if any('secret' not in acc for acc in accounts):
+                return False
+            ensure_uids(accounts)
+
+            aesgcm = AESGCM(bytes(self.key))
+            positions = plan_positions([self._rows[acc['uid']][0] if acc['uid'] in self._rows else None for acc in accounts])
+            rows = {}
+
+            conn = self._connect()
+            with conn:
+                if self._header_dirty:
+                    self._write_header(conn)
+
+                for acc, position in zip(accounts, positions):
+                    uid = acc['uid']
+                    stored = self._rows.get(uid)
+
+                    if stored is not None and stored[1] == acc:
+                        # Unchanged account, at most moved
+                        if stored[0] != position:
+                            conn.execute("UPDATE accounts SET position = ? WHERE uid = ?", (position, uid))
+                        rows[uid] = [position, stored[1]]
+                        continue
+
+                    meta = {k: v for k, v in acc.items() if k not in ('secret', 'uid')}
+                    secret = acc['secret']
+                    meta_changed = stored is None or meta != {k: v for k, v in stored[1].items() if k not in ('secret', 'uid')}
+                    secret_changed = stored is None or stored[1].get('secret') != secret
+
+                    if meta_changed:
+                        meta_nonce = os.urandom(12)
+                        meta_data = aesgcm.encrypt(meta_nonce, json.dumps(meta).encode(), ACCOUNT_META_AAD + uid.encode())
+                    if secret_changed:
+                        secret_bytes = secret.encode('utf-8') if isinstance(secret, str) else bytes(secret)
+                        secret_nonce = os.urandom(12)
+                        secret_data = aesgcm.encrypt(secret_nonce, secret_bytes, ACCOUNT_SECRET_AAD + uid.encode())
+
+                    if stored is None:
+                        conn.execute(
+                            "INSERT INTO accounts (uid, position, meta_nonce, meta, secret_nonce, secret) VALUES (?, ?, ?, ?, ?, ?)",
+                            (uid, position, meta_nonce, meta_data, secret_nonce, secret_data)
+                        )
+                    else:
+                        if meta_changed:
+                            conn.execute("UPDATE accounts SET meta_nonce = ?, meta = ? WHERE uid = ?", (meta_nonce, meta_data, uid))
+                        if secret_changed:
+                            conn.execute("UPDATE accounts SET secret_nonce = ?, secret = ? WHERE uid = ?", (secret_nonce, secret_data, uid))
+                        if stored[0] != position:
+                            conn.execute("UPDATE accounts SET position = ? WHERE uid = ?", (position, uid))
+
+                    rows[uid] = [position, acc.copy()]
+
+                deleted = [(uid,) for uid in self._rows if uid not in rows]
+                if deleted:
+                    conn.executemany("DELETE FROM accounts WHERE uid = ?", deleted)
+
+            # Only after the transaction committed
+            self._rows = rows
+            self._header_dirty = False
+            return True
+        except Exception:
+            return False
+
+    def _write_header(self, conn):
+        """Store the key slots (caller commits)"""
+        conn.execute("INSERT OR REPLACE INTO vault (key, value) VALUES ('version', ?)", (str(SQLITE_VAULT_VERSION),))
+        conn.execute("INSERT OR REPLACE INTO vault (key, value) VALUES ('slots', ?)", (json.dumps(self.slots),))
+
+    def _write_vault(self):
+        conn = self._connect()
+        with conn:
+            self._write_header(conn)
+        self._header_dirty = False
@@ -1,229 +1,584 @@
 import json
 import os
 import base64
-from cryptography.hazmat.primitives.kdf.argon2 import Argon2id
+import hashlib
+import hmac
+import struct
+import tempfile
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from core.kdf import CURRENT_KDF_PARAMS, KDF_ITERATIONS, KDF_LANES, KDF_MEMORY_COST, derive_key
+from core.secure_memory import secure_wipe_bytes
+from core.importer import iter_import_file
+from core.export_container import exportable_account, write_encrypted_export
+
+# Vault format: a random data key (DEK) encrypts the accounts and is stored
+# wrapped by one or more password-derived key slots.
+# The accounts are split into a small metadata section (everything but the
+# secrets, in list order) and a secrets section, encrypted separately so the
+# list can be shown before the secrets are decrypted.
+# Version 4 is a binary file: MAGIC, version byte, 4-byte header length, JSON
+# header (key slots, compression, section sizes), then each section as
+# nonce + ciphertext of the zlib-compressed plaintext.
+# The original single-salt JSON vault is still read and rewritten in this format.
+VAULT_MAGIC = b"TOTPVLT"
+VAULT_VERSION = 4
+VAULT_COMPRESSION = "zlib"
+COMPRESSION_LEVEL = 1
+VAULT_META_AAD = b"TOTP-Authenticator vault v4 metadata"
+VAULT_SECRETS_AAD = b"TOTP-Authenticator vault v4 secrets"
+KEY_SLOT_AAD = b"TOTP-Authenticator key slot"
+
+def ensure_uids(accounts):
+    """
+    Give every account a stable record id, so backends that store accounts
+    per record (see core.sqlite_storage) can diff saves by account.
+    Must run on the live account dicts, before they are snapshotted.
+    """
+    for acc in accounts:
+        if 'uid' not in acc:
+            acc['uid'] = uuid.uuid4().hex
 
 class Storage:
     def __init__(self, filepath="accounts.json"):
         self.filepath = filepath
+        # Session state: the data key (DEK) that encrypts the accounts, the key
+        # slots that wrap it, and which slot the session was unlocked with.
+        # Kept while unlocked so routine saves don't rerun Argon2id.
         self.key = None
+        self.slots = []
+        self.slot_index = 0
+        # Slots changed but the file still has the old header
+        self._header_dirty = False
+        # Encrypted sections currently on disk, so header-only changes don't re-encrypt
+        self._payload = None
+        # Secrets section not decrypted yet (see unlock_metadata / load_secrets)
+        self._pending_secrets = None
+        # Keyed digest of the plaintext last written/read, used to skip no-op saves
+        self.content_digest = None
+        # Single background worker: keeps KDF and file I/O off the UI thread
+        # while running storage operations in submission order
+        self._executor = None
 
-    def derive_key(self, password, salt=None, iterations=6, memory_cost=65536, lanes=4):
+    def exists(self):
+        """True if there is a vault to unlock (otherwise the app runs first-time setup)"""
+        return os.path.exists(self.filepath)
+
+    def submit(self, fn, *args, **kwargs):
         """
-        Derives a 32-byte AES-256 key from the password using Argon2id.
-        If salt is None, generates a new 16-byte salt.
-        Returns (key, salt)
+        Run a storage operation on the background worker.
+        Returns a concurrent.futures.Future; UI code should poll it from the
+        event loop (see ui.components.call_when_done) rather than block.
         """
-        if salt is None:
-            salt = os.urandom(16)
-        
-        # Argon2id parameters
-        kdf = Argon2id(
-            salt=salt,
-            length=32,
-            iterations=iterations,
-            lanes=lanes,
-            memory_cost=memory_cost,
-            ad=None,
-            secret=None
-        )
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="storage")
+        return self._executor.submit(fn, *args, **kwargs)
+
+    def wait_idle(self):
+        """Block until every submitted operation has finished"""
+        if self._executor is not None:
+            self._executor.submit(lambda: None).result()
+
+    def derive_key(self, password, salt=None, iterations=KDF_ITERATIONS, memory_cost=KDF_MEMORY_COST, lanes=KDF_LANES):
+        """Argon2id key derivation (see core.kdf.derive_key). Returns (key, salt)"""
+        return derive_key(password, salt, iterations, memory_cost, lanes)
+
+    def _make_slot(self, password, label="password", kek=None, salt=None):
+        """
+        Wrap the session DEK with a key derived from password.
+        kek/salt can be passed to reuse a key that was just derived with the
+        current KDF params (legacy migration).
+        """
+        if kek is None:
+            kek, salt = self.derive_key(password)
+        try:
+            nonce = os.urandom(12)
+            wrapped = AESGCM(bytes(kek)).encrypt(nonce, bytes(self.key), KEY_SLOT_AAD)
+        finally:
+            secure_wipe_bytes(kek)
         
-        if isinstance(password, (bytes, bytearray)):
-            password_bytes = password
-        else:
-            password_bytes = password.encode()
-            
-        key = kdf.derive(password_bytes)
-        return key, salt
+        return {
+            "label": label,
+            "salt": base64.b64encode(salt).decode(),
+            "kdf_params": dict(CURRENT_KDF_PARAMS),
+            "nonce": base64.b64encode(nonce).decode(),
+            "key": base64.b64encode(wrapped).decode()
+        }
+
+    def _open_slots(self, slots, password):
+        """
+        Try the password against each key slot.
+        Returns (dek, slot_index), or (None, None) if no slot accepts it.
+        """
+        for index, slot in enumerate(slots):
+            params = slot.get('kdf_params', {})
+            kek, _ = self.derive_key(
+                password,
+                base64.b64decode(slot['salt']),
+                params.get('iterations', KDF_ITERATIONS),
+                params.get('memory_cost', KDF_MEMORY_COST),
+                params.get('lanes', KDF_LANES)
+            )
+            try:
+                dek = AESGCM(bytes(kek)).decrypt(
+                    base64.b64decode(slot['nonce']),
+                    base64.b64decode(slot['key']),
+                    KEY_SLOT_AAD
+                )
+                return bytearray(dek), index
+            except Exception:
+                continue
+            finally:
+                secure_wipe_bytes(kek)
+        return None, None
+
+    def _set_session(self, key, slots, slot_index=0):
+        """Replace the session DEK and slots (wiping the previous key)"""
+        if self.key is not None and self.key is not key:
+            secure_wipe_bytes(self.key)
+        self.key = key
+        self.slots = slots
+        self.slot_index = slot_index
+        self._header_dirty = False
+        # The file on disk is not encrypted under this key yet
+        self._payload = None
+        self._pending_secrets = None
+        self.content_digest = None
+
+    def _new_vault_session(self, password):
+        """Fresh random DEK with a single password slot"""
+        self._set_session(bytearray(os.urandom(32)), [])
+        self.slots = [self._make_slot(password)]
+        self._header_dirty = True
+
+    def needs_rekey(self):
+        """True if there is no session key or its slot was derived with outdated KDF params"""
+        return self.key is None or self.slots[self.slot_index].get('kdf_params') != CURRENT_KDF_PARAMS
+
+    def lock(self):
+        """Forget the session key"""
+        if self.key is not None:
+            secure_wipe_bytes(self.key)
+        self.key = None
+        self.slots = []
+        self.slot_index = 0
+        self._header_dirty = False
+        self._payload = None
+        self._pending_secrets = None
+        self.content_digest = None
 
     def unlock(self, password):
         """
         Attempts to unlock the storage with the provided password.
         Returns True if successful (or if file doesn't exist yet), False otherwise.
         """
+        return self.unlock_and_load(password) is not None
+
+    def unlock_and_load(self, password):
+        """
+        Unlock and return the decrypted accounts in one pass: the file is read
+        once, and the plaintext that proves the password is also the account list.
+        Returns the accounts ([] for a new vault), or None if the password is wrong.
+        """
+        accounts = self.unlock_metadata(password)
+        if accounts is None:
+            return None
+        if not self.load_secrets():
+            self.lock()
+            return None
+        return accounts
+
+    def unlock_metadata(self, password):
+        """
+        First stage of a progressive unlock: check the password and decrypt
+        only the metadata section. The returned accounts have no 'secret'
+        until load_secrets() runs (has_pending_secrets() tells if it must).
+        A legacy single-salt vault is decrypted in full and migrated here.
+        Returns the accounts ([] for a new vault), or None if the password is wrong.
+        """
+        self._remove_stale_temp_files()
+        
         if not os.path.exists(self.filepath):
             # New file, just derive a key to be ready (using new defaults)
-            key, _ = self.derive_key(password)
-            self.key = key
-            return True
+            self._new_vault_session(password)
+            return []
 
         try:
-            with open(self.filepath, "r") as f:
-                data = json.load(f)
+            data = self._read_vault()
             
-            salt = base64.b64decode(data['salt'])
+            if 'slots' not in data:
+                return self._unlock_legacy(data, password)
             
-            # Get KDF params from file, or use legacy defaults
-            kdf_params = data.get('kdf_params', {})
-            iterations = kdf_params.get('iterations', 2) # Legacy default: 2
-            memory_cost = kdf_params.get('memory_cost', 65536)
-            lanes = kdf_params.get('lanes', 4)
+            dek, slot_index = self._open_slots(data['slots'], password)
+            if dek is None:
+                return None
+            self._set_session(dek, data['slots'], slot_index)
             
-            key, _ = self.derive_key(password, salt, iterations, memory_cost, lanes)
+            meta_json = zlib.decompress(self._decrypt_section(data['meta'], VAULT_META_AAD))
+            accounts = json.loads(meta_json.decode())
             
-            # Verify by attempting to decrypt
-            nonce = base64.b64decode(data['nonce'])
-            encrypted_data = base64.b64decode(data['data'])
+            self._payload = {"meta": data['meta'], "secrets": data['secrets']}
+            # Keep the list as loaded: secrets are matched to accounts by position
+            self._pending_secrets = (list(accounts), meta_json)
+            return accounts
+        except Exception:
+            # Authentication failed (or unreadable file)
+            self.lock()
+            return None
+
+    def has_pending_secrets(self):
+        """True between unlock_metadata() and load_secrets()"""
+        return self._pending_secrets is not None
+
+    def load_secrets(self):
+        """
+        Second stage of a progressive unlock: decrypt the secrets section and
+        put each secret into its account dict (the dicts returned by
+        unlock_metadata, in place). Returns True on success.
+        """
+        if self._pending_secrets is None:
+            return True
+        
+        accounts, meta_json = self._pending_secrets
+        try:
+            meta_nonce = self._payload["meta"][0]
+            # Bound to this metadata section so the two can't be mixed across saves
+            secrets_json = zlib.decompress(self._decrypt_section(self._payload["secrets"], VAULT_SECRETS_AAD + meta_nonce))
+            secrets = json.loads(secrets_json.decode())
+            if len(secrets) != len(accounts):
+                return False
             
-            aesgcm = AESGCM(key)
-            aesgcm.decrypt(nonce, encrypted_data, None)
+            # Convert secrets to bytearrays immediately for mutable memory
+            for acc, secret in zip(accounts, secrets):
+                acc['secret'] = bytearray(secret.encode('utf-8'))
+        except Exception:
+            return False
+        
+        self._pending_secrets = None
+        self.content_digest = self._digest(meta_json, secrets_json)
+        return True
+
+    def _decrypt_section(self, section, aad):
+        """Decrypt one (nonce, ciphertext) section with the session key"""
+        nonce, encrypted_data = section
+        return AESGCM(bytes(self.key)).decrypt(nonce, encrypted_data, aad)
+
+    def _read_vault(self):
+        """
+        Read the vault file. Sections of the binary format come back as
+        (nonce, ciphertext); a legacy JSON vault is returned as parsed.
+        """
+        with open(self.filepath, "rb") as f:
+            raw = f.read()
+        
+        if raw.startswith(VAULT_MAGIC):
+            offset = len(VAULT_MAGIC)
+            version = raw[offset]
+            if version != VAULT_VERSION:
+                raise ValueError("Unsupported vault version")
+            (header_length,) = struct.unpack_from(">I", raw, offset + 1)
+            offset += 5
+            header = json.loads(raw[offset:offset + header_length].decode())
+            offset += header_length
+            if header.get('compression') != VAULT_COMPRESSION:
+                raise ValueError("Unsupported vault compression")
             
-            self.key = key
-            return True
+            data = {"version": version, "slots": header['slots']}
+            for name, length in header['sections']:
+                data[name] = (raw[offset:offset + 12], raw[offset + 12:offset + 12 + length])
+                offset += 12 + length
+            return data
+        
+        return json.loads(raw.decode())
+
+    def _unlock_legacy(self, data, password):
+        """
+        Unlock a single-salt vault (key derived straight from the password)
+        and rewrite it in the key-slot format.
+        """
+        salt = base64.b64decode(data['salt'])
+        nonce = base64.b64decode(data['nonce'])
+        encrypted_data = base64.b64decode(data['data'])
+        
+        # Get KDF params from file, or use legacy defaults
+        kdf_params = data.get('kdf_params', {})
+        params = {
+            "iterations": kdf_params.get('iterations', 2), # Legacy default: 2
+            "memory_cost": kdf_params.get('memory_cost', 65536),
+            "lanes": kdf_params.get('lanes', 4)
+        }
+        
+        key, _ = self.derive_key(password, salt, **params)
+        
+        # Verify by decrypting (GCM authentication fails on a wrong key)
+        try:
+            decrypted_data = AESGCM(bytes(key)).decrypt(nonce, encrypted_data, None)
+            accounts = self._parse_accounts(decrypted_data)
+        except Exception:
+            secure_wipe_bytes(key)
+            raise
+        
+        # Migrate: random DEK wrapped by a password slot. The old key can serve
+        # as the slot key if its params are current; otherwise derive a new one.
+        self._set_session(bytearray(os.urandom(32)), [])
+        if params == CURRENT_KDF_PARAMS:
+            slot = self._make_slot(password, kek=key, salt=salt)
+        else:
+            secure_wipe_bytes(key)
+            slot = self._make_slot(password)
+        self.slots = [slot]
+        self._header_dirty = True
+        self._write_accounts(accounts)
+        
+        return accounts
+
+    def verify_password(self, password):
+        """Check a password against the unlocked vault's key slots (no file access)"""
+        if self.key is None:
+            return False
+        try:
+            dek, _ = self._open_slots(self.slots, password)
         except Exception:
-            # Authentication failed
             return False
+        if dek is None:
+            return False
+        secure_wipe_bytes(dek)
+        return True
 
     def save_accounts(self, accounts, password):
         """
         Encrypts and saves the accounts using AES-256-GCM.
-        Uses upgraded security parameters (iterations=6).
+        Reuses the session key; Argon2id only runs if there is no session key
+        yet or the slot still uses outdated KDF params (rewrapped here).
         """
         try:
-            # New security defaults
-            iterations = 6
-            memory_cost = 65536
-            lanes = 4
-            
-            # Generate new salt and key for every save
-            key, salt = self.derive_key(password, salt=None, iterations=iterations, memory_cost=memory_cost, lanes=lanes)
+            if self.key is None:
+                self._new_vault_session(password)
+            elif self.needs_rekey():
+                label = self.slots[self.slot_index].get('label', 'password')
+                self.slots[self.slot_index] = self._make_slot(password, label)
+                self._header_dirty = True
             
-            aesgcm = AESGCM(key)
-            nonce = os.urandom(12) # NIST recommended nonce size for GCM - ALWAYS FRESH
+            return self._write_accounts(accounts)
+        except Exception:
+            return False
+
+    def change_password(self, accounts, new_password):
+        """
+        Rewrap the data key under a new password (fresh salt). The accounts
+        themselves are only re-encrypted if they changed.
+        If the write fails the session keeps the old slot, so a later save
+        can't put the new password on disk.
+        """
+        previous = (list(self.slots), self.slot_index, self._header_dirty)
+        try:
+            index = self._password_slot_index()
+            self.slots[index] = self._make_slot(new_password, "password")
+            self.slot_index = index
+            self._header_dirty = True
+            if self._write_accounts(accounts):
+                return True
+        except Exception:
+            pass
+        self.slots, self.slot_index, self._header_dirty = previous
+        return False
+
+    def add_key_slot(self, passphrase, label="recovery"):
+        """
+        Add another passphrase (e.g. a recovery passphrase) that unlocks the
+        vault. Only the 32-byte data key is wrapped; the accounts are untouched.
+        """
+        if self.key is None or not self.exists():
+            return False
+        try:
+            self.slots.append(self._make_slot(passphrase, label))
+            self._write_vault()
+            return True
+        except Exception:
+            self.slots = self.slots[:-1]
+            return False
+
+    def _password_slot_index(self):
+        """Index of the main password slot"""
+        for index, slot in enumerate(self.slots):
+            if slot.get('label') == "password":
+                return index
+        return self.slot_index
+
+    def _write_accounts(self, accounts):
+        """Encrypt accounts with the session key and fresh nonces, then write the vault"""
+        try:
+            # Never overwrite the vault while secrets are still being loaded
+            if any('secret' not in acc for acc in accounts):
+                return False
             
-            # Prepare data for JSON serialization
+            # Split into metadata and secrets (matched by position).
             # We must decode bytearrays to strings for JSON, but we do it only here
-            serializable_accounts = []
+            metadata = []
+            secrets = []
             for acc in accounts:
-                acc_copy = acc.copy()
-                if isinstance(acc_copy.get('secret'), (bytes, bytearray)):
-                    acc_copy['secret'] = acc_copy['secret'].decode('utf-8')
-                serializable_accounts.append(acc_copy)
+                meta = acc.copy()
+                secret = meta.pop('secret')
+                if isinstance(secret, (bytes, bytearray)):
+                    secret = secret.decode('utf-8')
+                metadata.append(meta)
+                secrets.append(secret)
             
-            data_json = json.dumps(serializable_accounts).encode()
+            meta_json = json.dumps(metadata).encode()
+            secrets_json = json.dumps(secrets).encode()
             
             # Clear the temporary copy with strings
-            del serializable_accounts
-            encrypted_data = aesgcm.encrypt(nonce, data_json, None)
+            del metadata
+            del secrets
             
-            storage_data = {
-                "salt": base64.b64encode(salt).decode(),
-                "nonce": base64.b64encode(nonce).decode(),
-                "data": base64.b64encode(encrypted_data).decode(),
-                "kdf_params": {
-                    "iterations": iterations,
-                    "memory_cost": memory_cost,
-                    "lanes": lanes
-                }
-            }
+            digest = self._digest(meta_json, secrets_json)
+            if digest == self.content_digest and self._payload is not None and os.path.exists(self.filepath):
+                # Nothing changed since the last write: keep the file as it is,
+                # or just rewrite the header if a slot changed
+                if self._header_dirty:
+                    self._write_vault()
+                return True
             
-            with open(self.filepath, "w") as f:
-                json.dump(storage_data, f)
+            aesgcm = AESGCM(bytes(self.key))
+            # NIST recommended nonce size for GCM - ALWAYS FRESH
+            meta_nonce = os.urandom(12)
+            secrets_nonce = os.urandom(12)
+            # Compress before encrypting (ciphertext doesn't compress)
+            self._payload = {
+                "meta": (meta_nonce, aesgcm.encrypt(meta_nonce, zlib.compress(meta_json, COMPRESSION_LEVEL), VAULT_META_AAD)),
+                "secrets": (secrets_nonce, aesgcm.encrypt(secrets_nonce, zlib.compress(secrets_json, COMPRESSION_LEVEL), VAULT_SECRETS_AAD + meta_nonce))
+            }
+            self._write_vault()
+            self.content_digest = digest
             
-            self.key = key # Update current key
             return True
         except Exception:
             return False
 
-    def load_accounts(self):
+    def _write_vault(self):
+        """Write the key slots and the current encrypted sections (binary format)"""
+        header = json.dumps({
+            "slots": self.slots,
+            "compression": VAULT_COMPRESSION,
+            "sections": [[name, len(encrypted_data)] for name, (_, encrypted_data) in self._payload.items()]
+        }).encode()
+        
+        parts = [VAULT_MAGIC, bytes([VAULT_VERSION]), struct.pack(">I", len(header)), header]
+        for nonce, encrypted_data in self._payload.values():
+            parts.append(nonce)
+            parts.append(encrypted_data)
+        
+        self._atomic_write(b"".join(parts))
+        self._header_dirty = False
+
+    def _digest(self, meta_json, secrets_json):
         """
-        Loads accounts using the unlocked key.
+        Keyed digest of a plaintext payload. Keyed with the session key so it
+        reveals nothing about the accounts without the password.
         """
-        if not self.key:
-            raise Exception("Storage not unlocked")
-            
-        if not os.path.exists(self.filepath):
-            return []
-        
+        h = hmac.new(bytes(self.key), b"vault-content:", hashlib.sha256)
+        for part in (meta_json, secrets_json):
+            h.update(len(part).to_bytes(8, "big"))
+            h.update(part)
+        return h.digest()
+
+    def _remove_stale_temp_files(self):
+        """Delete temp files left behind by a write that was interrupted by a crash"""
+        directory = os.path.dirname(os.path.abspath(self.filepath))
         try:
-            with open(self.filepath, "r") as f:
-                data = json.load(f)
-            
-            nonce = base64.b64decode(data['nonce'])
-            encrypted_data = base64.b64decode(data['data'])
-            
-            aesgcm = AESGCM(self.key)
-            decrypted_data = aesgcm.decrypt(nonce, encrypted_data, None)
-            accounts = json.loads(decrypted_data.decode())
-            
-            # Convert secrets to bytearrays immediately for mutable memory
-            for acc in accounts:
-                if 'secret' in acc and isinstance(acc['secret'], str):
-                    acc['secret'] = bytearray(acc['secret'].encode('utf-8'))
-            
-            return accounts
+            for name in os.listdir(directory):
+                if name.startswith(".vault-") and name.endswith(".tmp"):
+                    os.remove(os.path.join(directory, name))
+        except OSError:
+            pass
+
+    def _atomic_write(self, content):
+        """
+        Replace the vault file without ever leaving a partial file behind:
+        write a temp file in the same directory, fsync it, rename it over
+        the vault, then fsync the directory so the rename itself is durable.
+        """
+        directory = os.path.dirname(os.path.abspath(self.filepath))
+        fd, tmp_path = tempfile.mkstemp(prefix=".vault-", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.filepath)
         except Exception:
-            return []
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        
+        # Directories can't be opened for fsync on Windows; NTFS journals the rename
+        if os.name == "posix":
+            dir_fd = os.open(directory, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
 
-    def export_accounts(self, accounts, format, filepath):
+    def _parse_accounts(self, decrypted_data):
+        """Turn the decrypted payload into account dicts"""
+        accounts = json.loads(decrypted_data.decode())
+        
+        # Convert secrets to bytearrays immediately for mutable memory
+        for acc in accounts:
+            if 'secret' in acc and isinstance(acc['secret'], str):
+                acc['secret'] = bytearray(acc['secret'].encode('utf-8'))
+        
+        return accounts
+
+    def export_accounts(self, accounts, format, filepath, passphrase=None):
         """
-        Exports accounts to a file in the specified format (json or csv).
-        WARNING: The exported file is NOT encrypted.
+        Exports accounts to a file in the specified format (json, csv or
+        encrypted). Accounts are written out one at a time (one chunk at a
+        time when encrypted), never as one big in-memory document.
+        WARNING: json and csv exports are NOT encrypted.
         """
         try:
             if format.lower() == 'json':
-                with open(filepath, 'w') as f:
-                    json.dump(accounts, f, indent=4)
+                with open(filepath, 'w', encoding='utf-8') as f:
+                    # Same layout as json.dump(accounts, f, indent=4)
+                    f.write("[")
+                    for i, acc in enumerate(accounts):
+                        f.write(",\n    " if i else "\n    ")
+                        f.write(json.dumps(exportable_account(acc), indent=4).replace("\n", "\n    "))
+                    f.write("\n]" if accounts else "]")
             elif format.lower() == 'csv':
                 import csv
-                with open(filepath, 'w', newline='') as f:
+                with open(filepath, 'w', newline='', encoding='utf-8') as f:
                     fieldnames = ['name', 'secret', 'digits', 'interval', 'algorithm']
                     writer = csv.DictWriter(f, fieldnames=fieldnames)
                     writer.writeheader()
                     for acc in accounts:
                         # Ensure we only write the fields we expect
-                        row = {k: acc.get(k) for k in fieldnames}
+                        record = exportable_account(acc)
+                        row = {k: record.get(k) for k in fieldnames}
                         writer.writerow(row)
+            elif format.lower() == 'encrypted':
+                if not passphrase:
+                    raise ValueError("Passphrase required")
+                with open(filepath, 'wb') as f:
+                    write_encrypted_export(accounts, f, passphrase)
             else:
                 raise ValueError("Unsupported format")
             return True
         except Exception:
             return False
 
-    def import_accounts(self, filepath):
+    def import_accounts(self, filepath, passphrase=None):
         """
-        Imports accounts from a file (json or csv).
+        Imports accounts from a file (json, csv or encrypted export).
         Automatically detects format.
-        Returns a list of account dicts.
+        Returns a list of account dicts (see core.importer for streaming).
         """
         try:
-            # Try JSON first
-            try:
-                with open(filepath, 'r') as f:
-                    accounts = json.load(f)
-                if isinstance(accounts, list):
-                    # Validate basic structure
-                    valid_accounts = []
-                    for acc in accounts:
-                        if 'name' in acc and 'secret' in acc:
-                             # Set defaults if missing
-                            acc.setdefault('digits', 6)
-                            acc.setdefault('interval', 30)
-                            acc.setdefault('algorithm', 'SHA1')
-                            valid_accounts.append(acc)
-                    return valid_accounts
-            except json.JSONDecodeError:
-                pass # Not JSON, try CSV
-
-            # Try CSV
-            import csv
-            accounts = []
-            with open(filepath, 'r') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if 'name' in row and 'secret' in row:
-                        # Convert types
-                        try:
-                            row['digits'] = int(row.get('digits', 6))
-                            row['interval'] = int(row.get('interval', 30))
-                        except ValueError:
-                            row['digits'] = 6
-                            row['interval'] = 30
-                        
-                        row.setdefault('algorithm', 'SHA1')
-                        accounts.append(row)
-            return accounts
-
+            return list(iter_import_file(filepath, passphrase))
         except Exception:
             return []
@@ -0,0 +1,62 @@
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from core.storage import Storage
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = "correct horse"
+
+# Child process: save the vault in a loop, alternating between two account lists
+WRITER = """
+import sys
+from core.storage import Storage
+
+path, password = sys.argv[1], sys.argv[2]
+storage = Storage(path)
+storage.unlock_and_load(password)
+versions = [
+    [{'name': f'acc{i}-{v}', 'secret': 'JBSWY3DPEHPK3PXP', 'digits': 6, 'interval': 30, 'algorithm': 'SHA1'} for i in range(5000)]
+    for v in range(2)
+]
+n = 0
+while True:
+    storage.save_accounts(versions[n % 2], password)
+    if n == 0:
+        print("saved", flush=True)
+    n += 1
+"""
+
+class KilledWriterTest(unittest.TestCase):
+    """A writer killed mid-save must leave a vault that still unlocks"""
+
+    def test_vault_survives_kill_during_save(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "accounts.json")
+            for _ in range(5):
+                writer = subprocess.Popen([sys.executable, "-c", WRITER, path, PASSWORD], cwd=ROOT, stdout=subprocess.PIPE, text=True)
+                try:
+                    self.assertEqual(writer.stdout.readline().strip(), "saved")
+                    time.sleep(random.uniform(0.0, 0.3))
+                finally:
+                    writer.kill() # SIGKILL on POSIX: no cleanup runs
+                    writer.wait()
+                    writer.stdout.close()
+
+                storage = Storage(path)
+                accounts = storage.unlock_and_load(PASSWORD)
+                self.assertIsNotNone(accounts)
+                self.assertEqual(len(accounts), 5000)
+                # Either the old or the new list, never a mix
+                self.assertIn({acc['name'].split('-')[1] for acc in accounts}, ({'0'}, {'1'}))
+                storage.lock()
+
+            # Temp files of interrupted writes are removed on unlock
+            self.assertEqual([name for name in os.listdir(directory) if name.endswith(".tmp")], [])
+
+if __name__ == "__main__":
+    unittest.main()
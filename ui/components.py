@@ -4,88 +4,136 @@ import math
 import pyperclip
 from PIL import Image, ImageDraw
 import os
+import sys
+import time
+from tkinter import messagebox
 
 from core.constants import COLOR_TEXT, COLOR_ACCENT, COLOR_BG_CARD
 
 from core.utils import get_asset_path
 
-def create_trashcan_icon(size=23):
-    """Load trashcan icon from assets folder"""
+def call_when_done(widget, future, callback, poll_ms=20):
+    """
+    Wait for a background Future without blocking the Tk event loop, then
+    call callback(future) on the main thread. Dropped if widget is destroyed.
+    """
+    def poll():
+        if not widget.winfo_exists():
+            return
+        if future.done():
+            callback(future)
+        else:
+            widget.after(poll_ms, poll)
+    
+    widget.after(poll_ms, poll)
+
+# Process-wide icon cache: (filename, size, color) -> CTkImage (or None if missing)
+# Every frame shares the same image instead of reopening the .ico files
+_ICON_CACHE = {}
+
+def recolor_image(img, color):
+    """Recolor every pixel to color while keeping the alpha channel (bulk channel operation)"""
+    img = img.convert("RGBA")
+    recolored = Image.new("RGBA", img.size, (*color, 255))
+    recolored.putalpha(img.getchannel("A"))
+    return recolored
+
+def load_icon(filename, size=23, color=None):
+    """Load (once per process) an icon from the assets folder, optionally recolored"""
+    key = (filename, size, color)
+    if key in _ICON_CACHE:
+        return _ICON_CACHE[key]
+    
+    icon = None
     try:
-        icon_path = get_asset_path("trash.ico")
+        icon_path = get_asset_path(filename)
         
         if os.path.exists(icon_path):
             img = Image.open(icon_path)
-            return ctk.CTkImage(light_image=img, dark_image=img, size=(size, size))
+            if color is not None:
+                img = recolor_image(img, color)
+            icon = ctk.CTkImage(light_image=img, dark_image=img, size=(size, size))
     except Exception:
         pass
     
-    # Fallback: return None or create a simple placeholder
-    return None
+    # Cache misses too, so a missing file is only checked once
+    _ICON_CACHE[key] = icon
+    return icon
+
+def create_trashcan_icon(size=23):
+    """Load trashcan icon from assets folder"""
+    return load_icon("trash.ico", size)
 
 def create_settings_icon(size=23):
     """Load settings icon from assets folder and recolor to light cream"""
-    try:
-        icon_path = get_asset_path("setting.ico")
-        
-        if os.path.exists(icon_path):
-            img = Image.open(icon_path).convert("RGBA")
-            
-            # Recolor to light cream (#FFFDD0)
-            # Convert RGB values from hex
-            cream_color = (255, 253, 208)  # #FFFDD0
-            
-            # Create a new image with the same size
-            data = img.getdata()
-            new_data = []
-            
-            for item in data:
-                # If pixel is not transparent
-                if item[3] > 0:
-                    # Replace with cream color, keep alpha
-                    new_data.append((*cream_color, item[3]))
-                else:
-                    new_data.append(item)
-            
-            img.putdata(new_data)
-            return ctk.CTkImage(light_image=img, dark_image=img, size=(size, size))
-    except Exception:
-        pass
-    
-    # Fallback: return None or create a simple placeholder
-    return None
+    # Light cream (#FFFDD0)
+    return load_icon("setting.ico", size, color=(255, 253, 208))
+
+# Shown instead of a code while the account's secret is still being decrypted
+PENDING_CODE = "--- ---"
+
+def format_code(code):
+    """Format code based on number of digits"""
+    if len(code) <= 4:
+        # 1-4 digits: just show it
+        return code
+    elif len(code) == 5:
+        # 5 digits: xxx xx
+        return f"{code[:3]} {code[3:]}"
+    elif len(code) == 6:
+        # 6 digits: xxx xxx
+        return f"{code[:3]} {code[3:]}"
+    elif len(code) == 7:
+        # 7 digits: xxx xxxx
+        return f"{code[:3]} {code[3:]}"
+    elif len(code) == 8:
+        # 8 digits: xxxx xxxx
+        return f"{code[:4]} {code[4:]}"
+    elif len(code) == 9:
+        # 9 digits: xxx xxx xxx
+        return f"{code[:3]} {code[3:6]} {code[6:]}"
+    else:
+        # Fallback for any other length
+        return code
 
 class CircularProgress(tk.Canvas):
+    """
+    Circular countdown drawn in retained mode: the background ring, arc and
+    text are created once and only updated through itemconfigure.
+    """
     def __init__(self, master, size=60, color=COLOR_TEXT, **kwargs):
         super().__init__(master, width=size, height=size, bg=master.cget("fg_color"), highlightthickness=0, **kwargs)
         self.size = size
         self.color = color
         self.angle = 360
-        self.text_id = self.create_text(size/2, size/2, text="30", fill=color, font=("Roboto", 15, "bold"))
-        self.draw()
+        self.text = "30"
+        
+        # Background circle (faint), progress arc and text, created once
+        self.bg_id = self.create_oval(2, 2, size-2, size-2, outline="#444444", width=2, tags="bg_circle")
+        self.arc_id = self.create_arc(2, 2, size-2, size-2, start=90, extent=self.angle, outline=color, width=3, style="arc", tags="arc")
+        self.text_id = self.create_text(size/2, size/2, text=self.text, fill=color, font=("Roboto", 15, "bold"))
 
     def set_progress(self, progress, remaining_seconds):
         # progress is 0.0 to 1.0
-        self.angle = 360 * progress
-        self.itemconfigure(self.text_id, text=str(int(remaining_seconds)))
-        self.draw()
+        angle = 360 * progress
+        text = str(int(remaining_seconds))
+        
+        # Only touch Tk for values that actually changed
+        if text != self.text:
+            self.text = text
+            self.itemconfigure(self.text_id, text=text)
+        if angle != self.angle:
+            self.angle = angle
+            self.draw()
 
     def draw(self):
-        # Clear only arcs, keep text
-        self.delete("arc")
-        self.delete("bg_circle")
-        
-        # Draw background circle (faint)
-        self.create_oval(2, 2, self.size-2, self.size-2, outline="#444444", width=2, tags="bg_circle")
-        # Draw progress arc
         if self.angle > 0:
-            self.create_arc(2, 2, self.size-2, self.size-2, start=90, extent=self.angle, outline=self.color, width=3, style="arc", tags="arc")
-        
-        # Ensure text is on top
-        self.tag_raise(self.text_id)
+            self.itemconfigure(self.arc_id, extent=self.angle, state="normal")
+        else:
+            self.itemconfigure(self.arc_id, state="hidden")
 
 class AccountFrame(ctk.CTkFrame):
-    def __init__(self, master, account, auth_engine, callbacks, **kwargs):
+    def __init__(self, master, account, auth_engine, callbacks, index=None, **kwargs):
         super().__init__(master, fg_color=COLOR_BG_CARD, corner_radius=10, **kwargs)
         
         # Extract account data (support both old dict format and new)
@@ -95,6 +143,8 @@ class AccountFrame(ctk.CTkFrame):
             self.digits = account.get('digits', 6)
             self.interval = account.get('interval', 30)
             self.algorithm = account.get('algorithm', 'SHA1')
+            # Secret not decrypted yet (progressive unlock)
+            self.is_pending = 'secret' not in account
         else:
             # Backwards compatibility if someone passes individual args
             self.name = account
@@ -102,10 +152,21 @@ class AccountFrame(ctk.CTkFrame):
             self.digits = 6
             self.interval = 30
             self.algorithm = 'SHA1'
+            self.is_pending = False
             auth_engine = callbacks
             
         self.auth_engine = auth_engine
         self.callbacks = callbacks # dict of callbacks: delete, move_up, move_down
+        self.index = index # position in the account list (frames may be recycled)
+        self.is_edit_mode = False
+        self.confirm_popup = None
+        
+        # Last values pushed to Tk, so ticks only touch widgets that changed
+        self.shown_code = None
+        self.shown_progress = None
+        
+        # Compiled key used for batched refreshes (None if the secret is invalid or pending)
+        self.otp_key = None if self.is_pending else self.auth_engine.compile(self.secret, digits=self.digits, interval=self.interval, algorithm=self.algorithm)
 
         # Layout
         self.grid_columnconfigure(1, weight=1)
@@ -149,8 +210,31 @@ class AccountFrame(ctk.CTkFrame):
         self.btn_delete.grid_remove()
         self.btn_settings.grid_remove()
 
+    def bind_account(self, index, account):
+        """Rebind a recycled frame to another account without rebuilding its widgets"""
+        self.close_popup()
+        
+        self.index = index
+        self.name = account.get('name', 'Unknown')
+        self.secret = account.get('secret', '')
+        self.digits = account.get('digits', 6)
+        self.interval = account.get('interval', 30)
+        self.algorithm = account.get('algorithm', 'SHA1')
+        self.is_pending = 'secret' not in account
+        self.otp_key = None if self.is_pending else self.auth_engine.compile(self.secret, digits=self.digits, interval=self.interval, algorithm=self.algorithm)
+        
+        self.label_name.configure(text=self.get_display_name())
+        self.update_code()
+
+    def get_display_name(self):
+        """Account name as shown in the current mode (truncated in edit mode)"""
+        display_name = self.name
+        if self.is_edit_mode and len(display_name) > 15:
+            display_name = display_name[:12] + "..."
+        return display_name
+
     def show_delete_confirmation(self):
-        if hasattr(self, 'confirm_popup') and self.confirm_popup and self.confirm_popup.winfo_exists():
+        if self.confirm_popup and self.confirm_popup.winfo_exists():
             self.confirm_popup.lift()
             return
 
@@ -184,11 +268,15 @@ class AccountFrame(ctk.CTkFrame):
         self.close_popup()
 
     def close_popup(self):
-        if hasattr(self, 'confirm_popup') and self.confirm_popup:
+        if self.confirm_popup:
             self.confirm_popup.destroy()
             self.confirm_popup = None
 
     def set_edit_mode(self, is_edit):
+        if is_edit == self.is_edit_mode:
+            return
+        self.is_edit_mode = is_edit
+        
         if is_edit:
             self.btn_copy.grid_remove()
             self.label_code.grid_remove()
@@ -199,11 +287,7 @@ class AccountFrame(ctk.CTkFrame):
             self.btn_settings.grid(row=0, column=1, padx=5)
             
             # Truncate name if too long
-            display_name = self.name
-            if len(display_name) > 15:
-                display_name = display_name[:12] + "..."
-            
-            self.label_name.configure(text=display_name, font=("Roboto", 20, "bold"), anchor="w")
+            self.label_name.configure(text=self.get_display_name(), font=("Roboto", 20, "bold"), anchor="w")
             self.label_name.grid(row=0, column=2, sticky="ew", pady=10, padx=(5, 0))
             
             self.btn_up.grid(row=0, column=3, padx=2)
@@ -253,44 +337,36 @@ class AccountFrame(ctk.CTkFrame):
         )
         dialog.show()
 
-    def update_code(self):
-        code = self.auth_engine.generate_totp(
-            self.secret, 
-            digits=self.digits, 
-            interval=self.interval, 
-            algorithm=self.algorithm
-        )
-        
-        # Format code based on number of digits
-        if len(code) <= 4:
-            # 1-4 digits: just show it
-            formatted_code = code
-        elif len(code) == 5:
-            # 5 digits: xxx xx
-            formatted_code = f"{code[:3]} {code[3:]}"
-        elif len(code) == 6:
-            # 6 digits: xxx xxx
-            formatted_code = f"{code[:3]} {code[3:]}"
-        elif len(code) == 7:
-            # 7 digits: xxx xxxx
-            formatted_code = f"{code[:3]} {code[3:]}"
-        elif len(code) == 8:
-            # 8 digits: xxxx xxxx
-            formatted_code = f"{code[:4]} {code[4:]}"
-        elif len(code) == 9:
-            # 9 digits: xxx xxx xxx
-            formatted_code = f"{code[:3]} {code[3:6]} {code[6:]}"
+    def update_code(self, code=None):
+        if self.is_pending:
+            formatted_code = PENDING_CODE
         else:
-            # Fallback for any other length
-            formatted_code = code
-            
-        self.label_code.configure(text=formatted_code)
+            # Codes may be precomputed in a batch by the list screen
+            if code is None:
+                code = self.auth_engine.generate_totp(
+                    self.secret, 
+                    digits=self.digits, 
+                    interval=self.interval, 
+                    algorithm=self.algorithm
+                )
+            formatted_code = format_code(code)
+        
+        if formatted_code != self.shown_code:
+            self.shown_code = formatted_code
+            self.label_code.configure(text=formatted_code)
         
-        # Update progress
+        self.update_progress()
+
+    def update_progress(self):
+        """Update only the countdown (cheap, called every second)"""
         remaining = self.auth_engine.get_remaining_time(interval=self.interval)
-        self.progress.set_progress(remaining / self.interval, remaining)
+        if (remaining, self.interval) != self.shown_progress:
+            self.shown_progress = (remaining, self.interval)
+            self.progress.set_progress(remaining / self.interval, remaining)
 
     def copy_code(self):
+        if self.is_pending:
+            return
         code = self.label_code.cget("text").replace(" ", "")
         pyperclip.copy(code)
         
@@ -298,3 +374,475 @@ class AccountFrame(ctk.CTkFrame):
         original_text = self.btn_copy.cget("text")
         self.btn_copy.configure(text="Copied!")
         self.after(1000, lambda: self.btn_copy.configure(text=original_text))
+
+def is_descendant(widget, ancestor):
+    """Check if widget is ancestor or one of its children (for bind_all handlers)"""
+    # event.widget may be a plain string for some internal Tk windows
+    while widget is not None and not isinstance(widget, str):
+        if widget == ancestor:
+            return True
+        widget = widget.master
+    return False
+
+class VirtualAccountList(ctk.CTkFrame):
+    """
+    Virtualized account list.
+    
+    Only the rows in view (plus a small overscan) have an AccountFrame.
+    Frames are kept in a ring indexed by account position, so a row that
+    scrolls out is recycled and rebound to the account scrolling in.
+    Cost of opening, scrolling and ticking does not depend on vault size.
+    """
+    ROW_HEIGHT = 95 # Includes the gap between rows
+    ROW_GAP = 10
+    OVERSCAN = 2 # Extra rows kept above and below the viewport
+    
+    def __init__(self, master, auth_engine, callbacks, **kwargs):
+        super().__init__(master, **kwargs)
+        self.auth_engine = auth_engine
+        self.callbacks = callbacks
+        self.accounts = []
+        self.rows = [] # Pool of recycled AccountFrames
+        self.offset = 0 # Scroll position in (unscaled) pixels
+        self.is_edit_mode = False
+        
+        self.viewport = ctk.CTkFrame(self, fg_color="transparent")
+        self.viewport.pack(side="left", fill="both", expand=True)
+        
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        
+        self.viewport.bind("<Configure>", lambda e: self.layout())
+        self.bind_all("<MouseWheel>", self._on_mouse_wheel, add="+")
+
+    def set_accounts(self, accounts):
+        """Bind the list to an account list (rows are rebound, not rebuilt)"""
+        self.accounts = accounts
+        for row in self.rows:
+            row.index = None # Force rebinding
+        self.layout()
+
+    def set_edit_mode(self, is_edit):
+        self.is_edit_mode = is_edit
+        for row in self.rows:
+            row.set_edit_mode(is_edit)
+
+    def refresh_codes(self, intervals=None):
+        """Regenerate codes of the bound rows (optionally only for some intervals) in one batched call"""
+        rows = [row for row in self.rows if row.index is not None and (intervals is None or row.interval in intervals)]
+        codes = self.auth_engine.generate_totp_many([row.otp_key for row in rows])
+        for row, code in zip(rows, codes):
+            row.update_code(code)
+
+    def update_countdowns(self):
+        """Update only the countdown of the bound rows"""
+        for row in self.rows:
+            if row.index is not None:
+                row.update_progress()
+
+    def get_viewport_height(self):
+        return self.viewport._reverse_widget_scaling(self.viewport.winfo_height())
+
+    def get_max_offset(self):
+        return max(0, len(self.accounts) * self.ROW_HEIGHT - self.get_viewport_height())
+
+    def yview(self, *args):
+        """Scrollbar protocol: ('moveto', fraction) or ('scroll', n, 'units'|'pages')"""
+        if not args:
+            return
+        
+        total_height = len(self.accounts) * self.ROW_HEIGHT
+        if args[0] == "moveto":
+            self.offset = float(args[1]) * total_height
+        elif args[0] == "scroll":
+            step = self.get_viewport_height() if args[2] == "pages" else self.ROW_HEIGHT / 3
+            self.offset += int(args[1]) * step
+        
+        self.layout()
+
+    def _on_mouse_wheel(self, event):
+        if not self.winfo_exists() or not is_descendant(event.widget, self):
+            return
+        
+        if sys.platform.startswith("win"):
+            self.yview("scroll", -int(event.delta / 120), "units")
+        else:
+            self.yview("scroll", -event.delta, "units")
+
+    def layout(self):
+        """Place rows for the visible window and rebind any recycled ones"""
+        viewport_height = self.get_viewport_height()
+        if viewport_height <= 1:
+            return # Not mapped yet, <Configure> will call again
+        
+        self.offset = max(0, min(self.offset, self.get_max_offset()))
+        
+        # Grow the pool to cover the viewport plus overscan
+        pool_size = math.ceil(viewport_height / self.ROW_HEIGHT) + 1 + 2 * self.OVERSCAN
+        while len(self.rows) < pool_size:
+            # CTk widgets take their size in the constructor only (place() refuses it);
+            # keep the grid from shrinking the frame to its contents
+            row = AccountFrame(self.viewport, {'name': '', 'secret': ''}, self.auth_engine, self.callbacks,
+                               height=self.ROW_HEIGHT - self.ROW_GAP)
+            row.grid_propagate(False)
+            row.set_edit_mode(self.is_edit_mode)
+            self.rows.append(row)
+        
+        first = max(0, int(self.offset // self.ROW_HEIGHT) - self.OVERSCAN)
+        last = min(len(self.accounts), first + len(self.rows))
+        
+        used = set()
+        for index in range(first, last):
+            slot = index % len(self.rows)
+            row = self.rows[slot]
+            used.add(slot)
+            
+            if row.index != index:
+                row.bind_account(index, self.accounts[index])
+            
+            row.place(x=0, y=index * self.ROW_HEIGHT - self.offset, relwidth=1.0)
+        
+        # Hide rows that are not needed (short lists, or after a delete)
+        for slot, row in enumerate(self.rows):
+            if slot not in used:
+                if row.winfo_manager():
+                    row.place_forget()
+                row.index = None
+        
+        # Update scrollbar thumb
+        total_height = len(self.accounts) * self.ROW_HEIGHT
+        if total_height <= viewport_height:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.offset / total_height, (self.offset + viewport_height) / total_height)
+
+class CanvasAccountRow:
+    """
+    One recycled row slot of CanvasAccountList.
+    Exposes the same index/bind_account interface as AccountFrame, so the
+    list screen callbacks work with either renderer.
+    """
+    def __init__(self, owner, slot):
+        self.owner = owner
+        self.tag = f"row{slot}"
+        self.index = None
+        self.y = 0 # Current top of the row on the canvas
+        self.name = ''
+        self.digits = 6
+        self.interval = 30
+        self.algorithm = 'SHA1'
+        self.is_pending = False
+        self.otp_key = None
+        self.code = None
+        self.remaining = None
+        self.items = {}
+
+    def bind_account(self, index, account):
+        """Rebind this slot to another account and redraw its text"""
+        self.index = index
+        self.name = account.get('name', 'Unknown')
+        self.digits = account.get('digits', 6)
+        self.interval = account.get('interval', 30)
+        self.algorithm = account.get('algorithm', 'SHA1')
+        self.is_pending = 'secret' not in account
+        self.otp_key = None if self.is_pending else self.owner.auth_engine.compile(
+            account.get('secret', ''),
+            digits=self.digits,
+            interval=self.interval,
+            algorithm=self.algorithm
+        )
+        self.code = None
+        self.remaining = None
+        self.owner.draw_name(self)
+        self.owner.refresh_codes(rows=[self])
+
+class CanvasAccountList(ctk.CTkFrame):
+    """
+    Account list drawn on a single Tk Canvas.
+    
+    Alternative to VirtualAccountList for very large vaults: each visible row
+    is a handful of canvas items instead of a CTkFrame widget tree. Clicks
+    are hit-tested against the row layout (copy in normal mode; delete,
+    settings, up and down in edit mode). Row items are recycled like the
+    frame pool and only updated when their text or progress changes.
+    """
+    ROW_HEIGHT = 95 # Includes the gap between rows
+    ROW_GAP = 10
+    OVERSCAN = 2
+    
+    def __init__(self, master, auth_engine, callbacks, **kwargs):
+        super().__init__(master, **kwargs)
+        self.auth_engine = auth_engine
+        self.callbacks = callbacks
+        self.accounts = []
+        self.rows = []
+        self.offset = 0 # Scroll position in canvas pixels
+        self.is_edit_mode = False
+        self.canvas_width = 0
+        
+        bg = self._apply_appearance_mode(self.cget("fg_color"))
+        self.canvas = tk.Canvas(self, bg=bg, highlightthickness=0)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        
+        self.canvas.bind("<Configure>", self._on_resize)
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.bind_all("<MouseWheel>", self._on_mouse_wheel, add="+")
+
+    # --- Geometry helpers (canvas pixels) ---
+    
+    def px(self, value):
+        return self._apply_widget_scaling(value)
+
+    def row_pitch(self):
+        return self.px(self.ROW_HEIGHT)
+
+    def get_max_offset(self):
+        return max(0, len(self.accounts) * self.row_pitch() - self.canvas.winfo_height())
+
+    # --- Public interface (same as VirtualAccountList) ---
+
+    def set_accounts(self, accounts):
+        self.accounts = accounts
+        for row in self.rows:
+            row.index = None # Force rebinding
+        self.layout()
+
+    def set_edit_mode(self, is_edit):
+        self.is_edit_mode = is_edit
+        self.canvas.itemconfigure("normal_mode", state="hidden" if is_edit else "normal")
+        self.canvas.itemconfigure("edit_mode", state="normal" if is_edit else "hidden")
+        for row in self.rows:
+            self.draw_name(row)
+
+    def refresh_codes(self, intervals=None, rows=None):
+        """Regenerate codes of bound rows (optionally only for some intervals), touching only what changed"""
+        if rows is None:
+            rows = [row for row in self.rows if row.index is not None and (intervals is None or row.interval in intervals)]
+        
+        codes = self.auth_engine.generate_totp_many([row.otp_key for row in rows])
+        for row, code in zip(rows, codes):
+            if row.is_pending:
+                code = PENDING_CODE
+            if code != row.code:
+                row.code = code
+                self.canvas.itemconfigure(row.items['code'], text=code if row.is_pending else format_code(code))
+        
+        self.update_countdowns(rows)
+
+    def update_countdowns(self, rows=None):
+        """Update only the countdown text and arc of bound rows"""
+        if rows is None:
+            rows = [row for row in self.rows if row.index is not None]
+        
+        now = int(time.time())
+        for row in rows:
+            remaining = row.interval - (now % row.interval)
+            if remaining != row.remaining:
+                row.remaining = remaining
+                self.canvas.itemconfigure(row.items['countdown'], text=str(remaining))
+                self.canvas.itemconfigure(row.items['arc'], extent=360 * remaining / row.interval)
+
+    # --- Scrolling ---
+
+    def yview(self, *args):
+        if not args:
+            return
+        
+        total_height = len(self.accounts) * self.row_pitch()
+        if args[0] == "moveto":
+            self.offset = float(args[1]) * total_height
+        elif args[0] == "scroll":
+            step = self.canvas.winfo_height() if args[2] == "pages" else self.row_pitch() / 3
+            self.offset += int(args[1]) * step
+        
+        self.layout()
+
+    def _on_mouse_wheel(self, event):
+        if not self.winfo_exists() or not is_descendant(event.widget, self):
+            return
+        
+        if sys.platform.startswith("win"):
+            self.yview("scroll", -int(event.delta / 120), "units")
+        else:
+            self.yview("scroll", -event.delta, "units")
+
+    def _on_resize(self, event):
+        if event.width != self.canvas_width:
+            # Row geometry depends on width: rebuild the pool
+            self.canvas_width = event.width
+            self.canvas.delete("all")
+            self.rows = []
+        self.layout()
+
+    # --- Drawing ---
+
+    def _round_rect(self, x1, y1, x2, y2, radius, **kwargs):
+        points = [
+            x1 + radius, y1, x2 - radius, y1, x2, y1, x2, y1 + radius,
+            x2, y2 - radius, x2, y2, x2 - radius, y2, x1 + radius, y2,
+            x1, y2, x1, y2 - radius, x1, y1 + radius, x1, y1
+        ]
+        return self.canvas.create_polygon(points, smooth=True, **kwargs)
+
+    def get_hit_areas(self):
+        """Clickable regions in row-local coordinates: action -> (x1, y1, x2, y2)"""
+        w = self.canvas_width
+        h = self.px(self.ROW_HEIGHT - self.ROW_GAP)
+        cy = h / 2
+        if self.is_edit_mode:
+            return {
+                'delete': (self.px(5), 0, self.px(45), h),
+                'settings': (self.px(45), 0, self.px(80), h),
+                'move_up': (w - self.px(80), 0, w - self.px(45), h),
+                'move_down': (w - self.px(45), 0, w - self.px(5), h)
+            }
+        return {
+            'copy': (w - self.px(70), cy - self.px(14), w - self.px(10), cy + self.px(14)),
+            'copy_code': (0, self.px(35), w - self.px(125), h)
+        }
+
+    def _create_row(self, slot):
+        row = CanvasAccountRow(self, slot)
+        c = self.canvas
+        w = self.canvas_width
+        h = self.px(self.ROW_HEIGHT - self.ROW_GAP)
+        cy = h / 2
+        cx = w - self.px(97)
+        r = self.px(20)
+        normal = (row.tag, "normal_mode")
+        edit = (row.tag, "edit_mode")
+        
+        self._round_rect(0, 0, w, h, self.px(10), fill=COLOR_BG_CARD, outline="", tags=(row.tag,))
+        row.items['name'] = c.create_text(self.px(15), self.px(22), anchor="w", text="", fill=COLOR_TEXT, font=("Roboto", 14), tags=(row.tag,))
+        
+        # Normal mode: code, progress arc, copy button
+        row.items['code'] = c.create_text(self.px(15), self.px(58), anchor="w", text="--- ---", fill=COLOR_TEXT, font=("Roboto", 28, "bold"), tags=normal)
+        c.create_oval(cx - r, cy - r, cx + r, cy + r, outline="#444444", width=2, tags=normal)
+        row.items['arc'] = c.create_arc(cx - r, cy - r, cx + r, cy + r, start=90, extent=360, outline=COLOR_TEXT, width=3, style="arc", tags=normal)
+        row.items['countdown'] = c.create_text(cx, cy, text="", fill=COLOR_TEXT, font=("Roboto", 15, "bold"), tags=normal)
+        self._round_rect(w - self.px(70), cy - self.px(12), w - self.px(15), cy + self.px(12), self.px(6), fill=COLOR_ACCENT, outline="", tags=normal)
+        row.items['copy'] = c.create_text(w - self.px(42), cy, text="Copy", fill=COLOR_TEXT, font=("Roboto", 12), tags=normal)
+        
+        # Edit mode: delete, settings, up, down
+        c.create_text(self.px(25), cy, text="🗑", fill=COLOR_TEXT, font=("Roboto", 16), tags=edit)
+        c.create_text(self.px(62), cy, text="⚙", fill=COLOR_TEXT, font=("Roboto", 18), tags=edit)
+        c.create_text(w - self.px(62), cy, text="▲", fill=COLOR_TEXT, font=("Roboto", 16), tags=edit)
+        c.create_text(w - self.px(25), cy, text="▼", fill=COLOR_TEXT, font=("Roboto", 16), tags=edit)
+        
+        c.itemconfigure(row.tag + "&&normal_mode", state="hidden" if self.is_edit_mode else "normal")
+        c.itemconfigure(row.tag + "&&edit_mode", state="normal" if self.is_edit_mode else "hidden")
+        return row
+
+    def draw_name(self, row):
+        if not row.items:
+            return
+        
+        h = self.px(self.ROW_HEIGHT - self.ROW_GAP)
+        if self.is_edit_mode:
+            # Truncate name if too long
+            display_name = row.name if len(row.name) <= 15 else row.name[:12] + "..."
+            self.canvas.itemconfigure(row.items['name'], text=display_name, font=("Roboto", 20, "bold"))
+            self.canvas.coords(row.items['name'], self.px(90), row.y + h / 2)
+        else:
+            self.canvas.itemconfigure(row.items['name'], text=row.name, font=("Roboto", 14))
+            self.canvas.coords(row.items['name'], self.px(15), row.y + self.px(22))
+
+    def _move_row(self, row, y):
+        if y != row.y:
+            self.canvas.move(row.tag, 0, y - row.y)
+            row.y = y
+
+    def layout(self):
+        """Position row slots for the visible window and rebind recycled ones"""
+        viewport_height = self.canvas.winfo_height()
+        if viewport_height <= 1 or self.canvas_width <= 1:
+            return # Not mapped yet, <Configure> will call again
+        
+        pitch = self.row_pitch()
+        self.offset = max(0, min(self.offset, self.get_max_offset()))
+        
+        pool_size = math.ceil(viewport_height / pitch) + 1 + 2 * self.OVERSCAN
+        while len(self.rows) < pool_size:
+            self.rows.append(self._create_row(len(self.rows)))
+        
+        first = max(0, int(self.offset // pitch) - self.OVERSCAN)
+        last = min(len(self.accounts), first + len(self.rows))
+        
+        used = set()
+        for index in range(first, last):
+            slot = index % len(self.rows)
+            row = self.rows[slot]
+            used.add(slot)
+            
+            self._move_row(row, index * pitch - self.offset)
+            if row.index != index:
+                row.bind_account(index, self.accounts[index])
+        
+        # Park unused slots below the visible area
+        for slot, row in enumerate(self.rows):
+            if slot not in used:
+                row.index = None
+                self._move_row(row, viewport_height + pitch * (slot + 1))
+        
+        total_height = len(self.accounts) * pitch
+        if total_height <= viewport_height:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.offset / total_height, (self.offset + viewport_height) / total_height)
+
+    # --- Hit testing ---
+
+    def _on_click(self, event):
+        pitch = self.row_pitch()
+        index = int((event.y + self.offset) // pitch)
+        row = next((r for r in self.rows if r.index == index), None)
+        if row is None:
+            return
+        
+        local_x = event.x
+        local_y = event.y - row.y
+        for action, (x1, y1, x2, y2) in self.get_hit_areas().items():
+            if x1 <= local_x <= x2 and y1 <= local_y <= y2:
+                self._run_action(action, row)
+                return
+
+    def _run_action(self, action, row):
+        if action in ('copy', 'copy_code'):
+            self.copy_code(row)
+        elif action == 'delete':
+            if messagebox.askyesno("Delete", f"Delete {row.name}?", parent=self):
+                self.callbacks['delete'](row)
+        elif action == 'settings':
+            self.show_settings_dialog(row)
+        else:
+            self.callbacks[action](row)
+
+    def copy_code(self, row):
+        if not row.code or row.is_pending:
+            return
+        pyperclip.copy(row.code)
+        
+        # Visual feedback
+        item = row.items['copy']
+        self.canvas.itemconfigure(item, text="Copied!")
+        self.after(1000, lambda: self.canvas.itemconfigure(item, text="Copy"))
+
+    def show_settings_dialog(self, row):
+        from ui.dialogs.settings_dialog import SettingsDialog
+        
+        def on_save(digits, period, algorithm):
+            if 'update_settings' in self.callbacks:
+                self.callbacks['update_settings'](row, digits, period, algorithm)
+
+        dialog = SettingsDialog(
+            parent=self,
+            title=f"Settings - {row.name}",
+            initial_digits=row.digits,
+            initial_period=row.interval,
+            initial_algorithm=row.algorithm,
+            on_save=on_save
+        )
+        dialog.show()
@@ -2,11 +2,15 @@ import customtkinter as ctk
 from tkinter import filedialog, messagebox
 import os
 from core.constants import COLOR_TEXT
+from core.export_container import EXPORT_EXTENSION
+from core.secure_memory import secure_wipe_bytes
+from ui.components import call_when_done
 from ui.dialogs.base_dialog import BaseDialog
+from ui.dialogs.passphrase_dialog import PassphraseDialog
 
 class ExportDialog(BaseDialog):
     def __init__(self, parent, app):
-        super().__init__(parent, "Export Warning", width=400, height=300)
+        super().__init__(parent, "Export Warning", width=400, height=400)
         self.app = app
         self.countdown = 5
 
@@ -34,6 +38,10 @@ class ExportDialog(BaseDialog):
         
         ctk.CTkButton(btn_frame, text="Cancel", width=140, height=36, fg_color="transparent", border_width=1, command=self.destroy).pack(side="left", padx=5)
         
+        # Encrypted alternative (no countdown needed)
+        ctk.CTkLabel(frame, text="Or protect the export with a passphrase:", font=("Roboto", 12), text_color=COLOR_TEXT).pack(pady=(15, 5))
+        ctk.CTkButton(frame, text="Encrypted Backup...", width=290, height=36, command=self.export_encrypted).pack()
+        
         # Start countdown
         self.update_countdown()
 
@@ -68,3 +76,38 @@ class ExportDialog(BaseDialog):
             self.destroy()
         else:
             messagebox.showerror("Error", "Failed to export accounts.", parent=self.dialog)
+
+    def export_encrypted(self):
+        filepath = filedialog.asksaveasfilename(
+            title="Export Encrypted Backup",
+            initialfile="TOTP_Backup",
+            defaultextension=EXPORT_EXTENSION,
+            filetypes=[("Encrypted Backup", f"*{EXPORT_EXTENSION}")],
+            parent=self.dialog
+        )
+        
+        if not filepath:
+            return
+        
+        self.destroy()
+        message = "Choose a passphrase for this backup. It is needed to import the file again."
+        dialog = PassphraseDialog(self.parent, "Encrypted Backup", message, lambda passphrase: self.start_encrypted_export(filepath, passphrase), confirm=True)
+        dialog.show()
+
+    def start_encrypted_export(self, filepath, passphrase):
+        # KDF and encryption run on the storage worker (lock waits for it)
+        storage = self.app.storage
+        future = storage.submit(storage.export_accounts, list(self.app.accounts), 'encrypted', filepath, passphrase)
+        call_when_done(self.app, future, lambda f: self._on_encrypted_export(f, passphrase))
+
+    def _on_encrypted_export(self, future, passphrase):
+        secure_wipe_bytes(passphrase)
+        try:
+            exported = future.result()
+        except Exception:
+            exported = False
+        
+        if exported:
+            messagebox.showinfo("Success", "Encrypted backup exported successfully!")
+        else:
+            messagebox.showerror("Error", "Failed to export accounts.")
@@ -0,0 +1,91 @@
+import os
+import customtkinter as ctk
+from core.constants import COLOR_TEXT
+from core.importer import ImportJob, ImportReport
+from core.secure_memory import secure_wipe_bytes
+from ui.dialogs.base_dialog import BaseDialog
+
+class ImportDialog(BaseDialog):
+    """
+    Progress dialog for a streaming import.
+    The file is read on a background thread; each chunk of accounts is
+    passed to on_chunk(accounts) on the UI thread, which returns how many
+    were added. on_finish(status, added, report, error) is called once at
+    the end with status "done", "cancelled" or "error" and the ImportReport
+    of rejected rows.
+    """
+    def __init__(self, parent, filepath, on_chunk, on_finish, passphrase=None):
+        super().__init__(parent, "Import Accounts", width=400, height=200)
+        self.filepath = filepath
+        self.on_chunk = on_chunk
+        self.on_finish = on_finish
+        self.job = ImportJob(filepath, passphrase=passphrase)
+        self.added = 0
+        self.report = ImportReport()
+        self.finished = False
+
+    def setup_ui(self):
+        frame = ctk.CTkFrame(self.dialog, fg_color="transparent")
+        frame.pack(fill="both", expand=True, padx=20, pady=20)
+
+        ctk.CTkLabel(frame, text=f"Importing {os.path.basename(self.filepath)}", font=("Roboto", 14, "bold"), text_color=COLOR_TEXT, wraplength=360).pack(pady=(0, 10))
+
+        self.progress = ctk.CTkProgressBar(frame, mode="determinate", width=340)
+        self.progress.set(0)
+        self.progress.pack(pady=5)
+
+        self.lbl_status = ctk.CTkLabel(frame, text="Reading file...", text_color=COLOR_TEXT)
+        self.lbl_status.pack(pady=5)
+
+        ctk.CTkButton(frame, text="Cancel", width=100, fg_color="transparent", border_width=1, command=self.cancel).pack(pady=10)
+        self.dialog.protocol("WM_DELETE_WINDOW", self.cancel)
+        # The window can also be destroyed from outside (auto-lock clears the container)
+        self.dialog.bind("<Destroy>", self.on_destroy, add="+")
+
+        self.job.start()
+        self.dialog.after(30, self.poll)
+
+    def poll(self):
+        if self.finished:
+            return
+
+        # The job's queue is bounded, so one poll handles at most a few chunks
+        for kind, value, fraction in self.job.poll():
+            if kind == "chunk":
+                accounts, errors = value
+                self.added += self.on_chunk(accounts)
+                self.report.add(errors)
+                self.progress.set(fraction)
+                self.lbl_status.configure(text=f"Imported {self.added} accounts ({int(fraction * 100)}%)")
+            elif kind == "done":
+                self.finish("done")
+                return
+            else:
+                self.finish("error", value)
+                return
+
+        self.dialog.after(30, self.poll)
+
+    def cancel(self):
+        if self.finished:
+            return
+        self.finish("cancelled")
+
+    def finish(self, status, error=None):
+        self.finished = True
+        self.stop_job()
+        self.destroy()
+        self.on_finish(status, self.added, self.report, error)
+
+    def on_destroy(self, event):
+        # <Destroy> also fires for every child widget
+        if event.widget is not self.dialog or self.finished:
+            return
+        self.finished = True
+        self.stop_job()
+
+    def stop_job(self):
+        """Stop the reader thread (a no-op once it is done) and wipe the passphrase"""
+        self.job.cancel()
+        if self.job.passphrase is not None:
+            secure_wipe_bytes(self.job.passphrase)
@@ -0,0 +1,58 @@
+import customtkinter as ctk
+from core.constants import COLOR_TEXT
+from ui.dialogs.base_dialog import BaseDialog
+
+class PassphraseDialog(BaseDialog):
+    """
+    Asks for the passphrase of an encrypted export.
+    With confirm=True (new export) the passphrase has to be typed twice.
+    on_submit(passphrase) gets it as a bytearray after the dialog is closed.
+    """
+    def __init__(self, parent, title, message, on_submit, confirm=False):
+        super().__init__(parent, title, width=350, height=330 if confirm else 250)
+        self.message = message
+        self.on_submit = on_submit
+        self.confirm = confirm
+
+    def setup_ui(self):
+        frame = ctk.CTkFrame(self.dialog, fg_color="transparent")
+        frame.pack(fill="both", expand=True, padx=20, pady=20)
+
+        ctk.CTkLabel(frame, text=self.message, text_color=COLOR_TEXT, wraplength=300).pack(pady=(0, 15))
+
+        ctk.CTkLabel(frame, text="Passphrase:", text_color=COLOR_TEXT).pack(anchor="w", pady=(0, 5))
+        self.entry_passphrase = ctk.CTkEntry(frame, width=300, show="*")
+        self.entry_passphrase.pack(pady=(0, 10))
+        self.entry_passphrase.bind("<Return>", lambda e: self.submit())
+
+        self.entry_repeat = None
+        if self.confirm:
+            ctk.CTkLabel(frame, text="Repeat Passphrase:", text_color=COLOR_TEXT).pack(anchor="w", pady=(0, 5))
+            self.entry_repeat = ctk.CTkEntry(frame, width=300, show="*")
+            self.entry_repeat.pack(pady=(0, 10))
+            self.entry_repeat.bind("<Return>", lambda e: self.submit())
+
+        self.lbl_error = ctk.CTkLabel(frame, text="", text_color="red")
+        self.lbl_error.pack(pady=5)
+
+        btn_frame = ctk.CTkFrame(frame, fg_color="transparent")
+        btn_frame.pack(pady=5)
+        ctk.CTkButton(btn_frame, text="OK", width=140, height=36, command=self.submit).pack(side="left", padx=5)
+        ctk.CTkButton(btn_frame, text="Cancel", width=140, height=36, fg_color="transparent", border_width=1, command=self.destroy).pack(side="left", padx=5)
+
+        self.entry_passphrase.focus_set()
+
+    def submit(self):
+        passphrase = self.entry_passphrase.get()
+        if not passphrase:
+            self.lbl_error.configure(text="Passphrase cannot be empty")
+            return
+        if self.entry_repeat is not None and passphrase != self.entry_repeat.get():
+            self.lbl_error.configure(text="Passphrases do not match")
+            return
+
+        # Convert to bytearray for mutable security
+        passphrase_bytes = bytearray(passphrase.encode('utf-8'))
+        del passphrase
+        self.destroy()
+        self.on_submit(passphrase_bytes)
@@ -1,6 +1,7 @@
 import customtkinter as ctk
 from core.constants import COLOR_TEXT
 from ui.dialogs.base_dialog import BaseDialog
+from ui.components import call_when_done
 
 class ChangePasswordDialog(BaseDialog):
     def __init__(self, parent, app):
@@ -48,12 +49,7 @@ class ChangePasswordDialog(BaseDialog):
             new = entry_new.get()
             repeat = entry_repeat.get()
             
-            # Validate current password
-            if not self.app.storage.unlock(current):
-                lbl_message.configure(text="Current password is incorrect", text_color="red")
-                return
-            
-            # Validate new password
+            # Validate new password first (cheap checks before running the KDF)
             if not new:
                 lbl_message.configure(text="New password cannot be empty", text_color="red")
                 return
@@ -61,18 +57,37 @@ class ChangePasswordDialog(BaseDialog):
             if new != repeat:
                 lbl_message.configure(text="New passwords do not match", text_color="red")
                 return
+
+            # The snapshot below has no secrets until the unlock finishes
+            if self.app.storage.has_pending_secrets():
+                lbl_message.configure(text="Still unlocking accounts, try again shortly", text_color="red")
+                return
+
+            # Both key derivations run on the storage worker so the dialog stays responsive
+            def rekey():
+                if not self.app.storage.verify_password(current):
+                    return "bad_password"
+                # Rewrap the vault's data key under the new password
+                if not self.app.storage.change_password(snapshot, new):
+                    return "failed"
+                return "ok"
             
-            # Change password
-            try:
-                # Load current accounts
-                accounts = self.app.storage.load_accounts()
+            def on_done(future):
+                try:
+                    result = future.result()
+                except Exception:
+                    result = "failed"
                 
-                # Re-encrypt with new password
-                self.app.storage.unlock(new)
-                self.app.storage.save_accounts(accounts, new)
+                if result != "ok":
+                    set_busy(False)
+                    if result == "bad_password":
+                        lbl_message.configure(text="Current password is incorrect", text_color="red")
+                    else:
+                        lbl_message.configure(text="Failed to change password", text_color="red")
+                    return
                 
                 # Update current password
-                self.app.password = new
+                self.app.password = bytearray(new.encode('utf-8'))
                 
                 # Show success state inline
                 # Disable all input fields
@@ -87,10 +102,21 @@ class ChangePasswordDialog(BaseDialog):
                 btn_cancel.configure(state="disabled", fg_color="gray40", border_color="gray40")
                 
                 # Change the "Change Password" button to "OK" and make it close the dialog
-                btn_change.configure(text="OK", command=self.destroy)
-                
-            except Exception:
-                lbl_message.configure(text="Failed to change password", text_color="red")
+                btn_change.configure(text="OK", state="normal", command=self.destroy)
+                self.dialog.protocol("WM_DELETE_WINDOW", self.destroy)
+            
+            snapshot = [acc.copy() for acc in self.app.accounts]
+            set_busy(True)
+            call_when_done(frame, self.app.storage.submit(rekey), on_done)
+        
+        def set_busy(busy):
+            state = "disabled" if busy else "normal"
+            for widget in (entry_current, entry_new, entry_repeat, btn_change, btn_cancel):
+                widget.configure(state=state)
+            # The vault may be re-keyed either way: keep the dialog open until the result is shown
+            self.dialog.protocol("WM_DELETE_WINDOW", (lambda: None) if busy else self.destroy)
+            if busy:
+                lbl_message.configure(text="Changing password...", text_color=COLOR_TEXT)
         
         # Configure the change button command
         btn_change.configure(command=change_password)
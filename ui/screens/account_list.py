@@ -1,15 +1,25 @@
 import customtkinter as ctk
+import time
 from tkinter import filedialog, messagebox
 from core.constants import COLOR_TEXT, COLOR_BG_CARD, COLOR_ACCENT
-from ui.components import AccountFrame
+from core.scheduler import BoundaryScheduler
+from core.export_container import EXPORT_EXTENSION, ExportFileError, is_encrypted_export
+from ui.components import VirtualAccountList, CanvasAccountList
 from ui.dialogs.export_dialog import ExportDialog
+from ui.dialogs.import_dialog import ImportDialog
+from ui.dialogs.passphrase_dialog import PassphraseDialog
 
 class MainListScreen:
     def __init__(self, container, app):
         self.container = container
         self.app = app
-        self.account_frames = []
+        self.account_list = None
+        self.empty_state = None
         self.is_edit_mode = False
+        self.scheduler = BoundaryScheduler()
+        self.boundary_job = None
+        self.import_start = 0
+        self.import_seen = 0
 
     def show(self):
         self.is_edit_mode = False
@@ -28,21 +38,71 @@ class MainListScreen:
         self.btn_edit = ctk.CTkButton(header, text="Edit", width=60, fg_color="transparent", border_width=1, text_color=COLOR_TEXT, command=self.toggle_edit_mode)
         self.btn_edit.pack(side="right", padx=0, pady=15)
 
-        # Scrollable Account List
-        self.scroll_frame = ctk.CTkScrollableFrame(self.container, width=380)
-        self.scroll_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        # Account List (only visible rows are built, engine selected by config)
+        callbacks = {
+            'delete': self.delete_account,
+            'move_up': self.move_up,
+            'move_down': self.move_down,
+            'update_settings': self.update_account_settings
+        }
+        if self.app.config.list_renderer == "canvas":
+            list_class = CanvasAccountList
+        else:
+            list_class = VirtualAccountList
+        self.account_list = list_class(self.container, self.app.auth_engine, callbacks, width=380)
+        
+        # Empty State
+        self.empty_state = ctk.CTkFrame(self.container, fg_color="transparent")
+        ctk.CTkLabel(self.empty_state, text="No accounts yet", font=("Roboto", 16), text_color=COLOR_TEXT).pack(pady=10)
+        ctk.CTkButton(self.empty_state, text="Import Accounts", command=self.import_accounts).pack(pady=10)
 
         self.refresh_account_list()
 
     def update(self):
-        """Called by App timer loop"""
+        """Called by App timer loop: only the countdowns change every second"""
         try:
-            for frame in self.account_frames:
-                if frame.winfo_exists():
-                    frame.update_code()
+            if self.account_list and self.account_list.winfo_exists():
+                self.account_list.update_countdowns()
         except Exception:
             pass
 
+    def schedule_next_boundary(self):
+        """Arm a timer for the earliest time-step boundary among the interval groups"""
+        if self.boundary_job is not None:
+            self.account_list.after_cancel(self.boundary_job)
+            self.boundary_job = None
+        
+        boundary = self.scheduler.next_boundary()
+        if boundary is None:
+            return
+        
+        delay_ms = max(0, int((boundary - time.time()) * 1000) + 1)
+        self.boundary_job = self.account_list.after(delay_ms, self.on_boundary)
+
+    def on_boundary(self):
+        """Regenerate codes only for the interval groups whose window rolled over"""
+        self.boundary_job = None
+        if not self.account_list.winfo_exists():
+            return # Screen was torn down (lock or navigation)
+        
+        try:
+            due = self.scheduler.pop_due()
+            if due:
+                self.account_list.refresh_codes(set(due))
+                
+                # Measure how late the new codes are on screen relative to their boundary
+                if self.app.boundary_latency_hook is not None:
+                    self.account_list.update_idletasks()
+                    shown_at = time.time()
+                    for interval in due:
+                        boundary = (int(shown_at) // interval) * interval
+                        self.app.report_boundary_latency(interval, shown_at - boundary)
+        except Exception:
+            pass
+        
+        # Timer may fire a little early: nothing is due then and we simply re-arm
+        self.schedule_next_boundary()
+
     def show_menu(self):
         """Show context menu with options"""
         # Create menu window
@@ -92,64 +152,110 @@ class MainListScreen:
             self.btn_add.pack(side="right", padx=(10, 20), pady=15) # Show +
             self.btn_edit.pack(side="right", padx=0, pady=15)
         
-        for frame in self.account_frames:
-            frame.set_edit_mode(self.is_edit_mode)
+        self.account_list.set_edit_mode(self.is_edit_mode)
 
     def refresh_account_list(self):
-        for widget in self.scroll_frame.winfo_children():
-            widget.destroy()
-
-        self.account_frames = []
-        
+        """Rebind the visible rows to the current account list"""
         # Empty State
         if not self.app.accounts:
-            frame = ctk.CTkFrame(self.scroll_frame, fg_color="transparent")
-            frame.pack(expand=True, pady=50)
-            
-            ctk.CTkLabel(frame, text="No accounts yet", font=("Roboto", 16), text_color=COLOR_TEXT).pack(pady=10)
-            ctk.CTkButton(frame, text="Import Accounts", command=self.import_accounts).pack(pady=10)
-            return
-
-        callbacks = {
-            'delete': self.delete_account,
-            'move_up': self.move_up,
-            'move_down': self.move_down,
-            'update_settings': self.update_account_settings
-        }
+            self.account_list.pack_forget()
+            self.empty_state.pack(expand=True, pady=50)
+        else:
+            self.empty_state.pack_forget()
+            self.account_list.pack(fill="both", expand=True, padx=10, pady=10)
         
-        for acc in self.app.accounts:
-            # Pass the full account dict to AccountFrame
-            frame = AccountFrame(self.scroll_frame, acc, self.app.auth_engine, callbacks)
-            frame.pack(fill="x", pady=5)
-            self.account_frames.append(frame)
+        self.account_list.set_accounts(self.app.accounts)
+        self.reschedule()
+
+    def on_secrets_loaded(self):
+        """Progressive unlock finished: rebind rows so they show real codes"""
+        self.refresh_account_list()
+
+    def pause(self):
+        """Stop boundary refreshes while the window is hidden (low-power mode)"""
+        if self.boundary_job is not None:
+            self.account_list.after_cancel(self.boundary_job)
+            self.boundary_job = None
+
+    def resume(self):
+        """Catch up after pause with one batched refresh"""
+        self.scheduler.next_boundaries = {}
+        self.account_list.refresh_codes()
+        self.reschedule()
+
+    def on_clock_jump(self):
+        """Wall clock changed: recompute every boundary and refresh all codes"""
+        self.resume()
+
+    def reschedule(self):
+        """Regroup accounts by interval after the list or an interval changed"""
+        self.scheduler.set_intervals(acc.get('interval', 30) for acc in self.app.accounts)
+        self.schedule_next_boundary()
 
     def import_accounts(self):
         filepath = filedialog.askopenfilename(
             title="Import Accounts",
-            filetypes=[("JSON/CSV Files", "*.json *.csv"), ("All Files", "*.*")]
+            filetypes=[("Export Files", f"*.json *.csv *{EXPORT_EXTENSION}"), ("otpauth URI Lists", "*.txt"), ("All Files", "*.*")]
         )
         
         if filepath:
-            new_accounts = self.app.storage.import_accounts(filepath)
-            if new_accounts:
-                # Merge accounts (append)
-                count = 0
-                for acc in new_accounts:
-                    # Simple duplicate check by secret
-                    if not any(a['secret'] == acc['secret'] for a in self.app.accounts):
-                        self.app.accounts.append(acc)
-                        count += 1
-                
-                if count > 0:
-                    self.app.storage.save_accounts(self.app.accounts, self.app.password)
-                    self.refresh_account_list()
-                    messagebox.showinfo("Success", f"Imported {count} accounts.")
-                else:
-                    messagebox.showinfo("Info", "No new accounts found (duplicates skipped).")
+            if self.app.storage.has_pending_secrets():
+                # Duplicates can't be detected until every secret is loaded
+                messagebox.showinfo("Info", "Accounts are still being unlocked. Please try again in a moment.")
+                return
+
+            if is_encrypted_export(filepath):
+                message = "Enter the passphrase of this encrypted backup."
+                dialog = PassphraseDialog(self.container, "Import Encrypted Backup", message, lambda passphrase: self.start_import(filepath, passphrase))
+                dialog.show()
             else:
+                self.start_import(filepath)
+
+    def start_import(self, filepath, passphrase=None):
+        # Accounts are appended chunk by chunk; a cancelled import is rolled back
+        self.import_start = len(self.app.accounts)
+        self.import_seen = 0
+        dialog = ImportDialog(self.container, filepath, self.merge_imported, self.finish_import, passphrase)
+        dialog.show()
+
+    def merge_imported(self, accounts):
+        """Append one chunk of imported accounts, returns how many were new"""
+        self.import_seen += len(accounts)
+        count = 0
+        for acc in accounts:
+            # Duplicate check by (normalized) secret, also within the file
+            if self.app.secret_index.add_new(acc['secret']):
+                self.app.accounts.append(acc)
+                count += 1
+        return count
+
+    def finish_import(self, status, count, report, error):
+        if status != "done":
+            for acc in self.app.accounts[self.import_start:]:
+                self.app.secret_index.remove(acc['secret'])
+            del self.app.accounts[self.import_start:]
+            if isinstance(error, ExportFileError):
+                messagebox.showerror("Error", f"Failed to import accounts: {error}.")
+            elif status == "error":
                 messagebox.showerror("Error", "Failed to import accounts. Check file format.")
+            return
+
+        # Per-row report of what was rejected
+        skipped = f"\n\nSkipped {report.count} invalid rows:\n{report.summary()}" if report.count else ""
+
+        if count > 0:
+            self.app.save_queue.mark_dirty(self.app.accounts, self.app.password)
+            self.refresh_account_list()
+            messagebox.showinfo("Success", f"Imported {count} accounts.{skipped}")
+        elif self.import_seen > 0:
+            messagebox.showinfo("Info", f"No new accounts found (duplicates skipped).{skipped}")
+        else:
+            messagebox.showerror("Error", f"Failed to import accounts. Check file format.{skipped}")
 
     def export_accounts(self):
+        if self.app.storage.has_pending_secrets():
+            messagebox.showinfo("Info", "Accounts are still being unlocked. Please try again in a moment.")
+            return
         dialog = ExportDialog(self.container, self.app)
         dialog.show()
     
@@ -159,58 +265,47 @@ class MainListScreen:
         dialog.show()
 
     def delete_account(self, account_frame):
-        try:
-            index = self.account_frames.index(account_frame)
-            self.app.accounts.pop(index)
-            self.save_and_refresh()
-        except ValueError:
-            pass
+        index = account_frame.index
+        if index is None or not (0 <= index < len(self.app.accounts)):
+            return
+        
+        removed = self.app.accounts.pop(index)
+        if 'secret' in removed:
+            self.app.secret_index.remove(removed['secret'])
+        self.app.auth_engine.invalidate(removed.get('secret'))
+        self.save_and_refresh()
 
     def move_up(self, account_frame):
-        try:
-            index = self.account_frames.index(account_frame)
-            if index > 0:
-                # Swap with previous item
-                self.app.accounts[index], self.app.accounts[index - 1] = self.app.accounts[index - 1], self.app.accounts[index]
-                self.save_and_refresh()
-        except ValueError:
-            pass
+        index = account_frame.index
+        if index is not None and 0 < index < len(self.app.accounts):
+            # Swap with previous item
+            self.app.accounts[index], self.app.accounts[index - 1] = self.app.accounts[index - 1], self.app.accounts[index]
+            self.save_and_refresh()
 
     def move_down(self, account_frame):
-        try:
-            index = self.account_frames.index(account_frame)
-            if index < len(self.account_frames) - 1:
-                # Swap with next item
-                self.app.accounts[index], self.app.accounts[index + 1] = self.app.accounts[index + 1], self.app.accounts[index]
-                self.save_and_refresh()
-        except ValueError:
-            pass
+        index = account_frame.index
+        if index is not None and 0 <= index < len(self.app.accounts) - 1:
+            # Swap with next item
+            self.app.accounts[index], self.app.accounts[index + 1] = self.app.accounts[index + 1], self.app.accounts[index]
+            self.save_and_refresh()
 
     def save_and_refresh(self):
-        """Helper to save accounts, refresh list, and restore edit mode"""
-        self.app.storage.save_accounts(self.app.accounts, self.app.password)
+        """Helper to queue a save and rebind the list (edit mode is kept by the list)"""
+        self.app.save_queue.mark_dirty(self.app.accounts, self.app.password)
         self.refresh_account_list()
-        
-        # Restore edit mode state for the new frames
-        if self.is_edit_mode:
-            for frame in self.account_frames:
-                frame.set_edit_mode(True)
 
     def update_account_settings(self, account_frame, digits, period, algorithm):
         """Update TOTP settings for an existing account"""
-        try:
-            index = self.account_frames.index(account_frame)
-            # Update account settings
-            self.app.accounts[index]['digits'] = digits
-            self.app.accounts[index]['interval'] = period
-            self.app.accounts[index]['algorithm'] = algorithm
-            # Save changes
-            self.app.storage.save_accounts(self.app.accounts, self.app.password)
-            # Update the frame's settings
-            account_frame.digits = digits
-            account_frame.interval = period
-            account_frame.algorithm = algorithm
-            # Force code to regenerate with new settings
-            account_frame.update_code()
-        except ValueError:
-            pass
+        index = account_frame.index
+        if index is None or not (0 <= index < len(self.app.accounts)):
+            return
+        
+        # Update account settings
+        self.app.accounts[index]['digits'] = digits
+        self.app.accounts[index]['interval'] = period
+        self.app.accounts[index]['algorithm'] = algorithm
+        # Save changes
+        self.app.save_queue.mark_dirty(self.app.accounts, self.app.password)
+        # Rebind the frame so its key and code use the new settings
+        account_frame.bind_account(index, self.app.accounts[index])
+        self.reschedule()
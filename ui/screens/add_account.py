@@ -1,5 +1,6 @@
 import customtkinter as ctk
 from core.constants import COLOR_TEXT
+from core.otp import normalize_base32
 
 class AddAccountScreen:
     def __init__(self, container, app):
@@ -67,11 +68,18 @@ class AddAccountScreen:
             return
 
         # Validate Secret
-        secret = secret.replace(" ", "").upper()
-        if not self.app.auth_engine.validate_secret(secret):
+        # Same canonical form as imported secrets: uppercase, no whitespace or padding
+        # Store secret as bytearray for mutable security
+        try:
+            secret_bytes = bytearray(normalize_base32(secret))
+        except ValueError:
             self.lbl_error.configure(text="Invalid Secret Key")
             return
         
+        if secret_bytes in self.app.secret_index:
+            self.lbl_error.configure(text="This secret key is already added")
+            return
+        
         # Get advanced settings (if expanded)
         if self.advanced_expanded:
             try:
@@ -100,9 +108,6 @@ class AddAccountScreen:
             algorithm = "SHA1"
         
         # Create account with all settings
-        # Store secret as bytearray for mutable security
-        secret_bytes = bytearray(secret.encode('utf-8'))
-        
         account = {
             'name': name,
             'secret': secret_bytes,
@@ -112,7 +117,9 @@ class AddAccountScreen:
         }
         
         self.app.accounts.append(account)
-        self.app.storage.save_accounts(self.app.accounts, self.app.password)
+        self.app.secret_index.add(secret_bytes)
+        self.app.auth_engine.compile_account(account)
+        self.app.save_queue.mark_dirty(self.app.accounts, self.app.password)
         
         # Clear local string references
         del secret
@@ -1,15 +1,18 @@
 import customtkinter as ctk
 from core.constants import COLOR_TEXT
+from ui.components import call_when_done
 
 class LoginScreen:
     def __init__(self, container, storage, on_success):
         self.container = container
         self.storage = storage
         self.on_success = on_success # callback(password, accounts)
+        self.busy = False
 
     def show(self):
         frame = ctk.CTkFrame(self.container, fg_color="transparent")
         frame.place(relx=0.5, rely=0.5, anchor="center")
+        self.frame = frame
 
         ctk.CTkLabel(frame, text="Welcome Back", font=("Roboto", 24, "bold"), text_color=COLOR_TEXT).pack(pady=20)
         
@@ -17,20 +20,54 @@ class LoginScreen:
         self.entry_password.pack(pady=10)
         self.entry_password.bind("<Return>", self.login)
         
-        ctk.CTkButton(frame, text="Unlock", width=220, command=self.login).pack(pady=10)
+        self.btn_unlock = ctk.CTkButton(frame, text="Unlock", width=220, command=self.login)
+        self.btn_unlock.pack(pady=10)
         
         self.lbl_error = ctk.CTkLabel(frame, text="", text_color="red")
         self.lbl_error.pack(pady=5)
+        
+        # Shown while the key derivation runs in the background
+        self.progress = ctk.CTkProgressBar(frame, width=220, mode="indeterminate")
+
+    def set_busy(self, busy):
+        """Disable input and show progress while unlocking"""
+        self.busy = busy
+        state = "disabled" if busy else "normal"
+        self.entry_password.configure(state=state)
+        self.btn_unlock.configure(state=state, text="Unlocking..." if busy else "Unlock")
+        if busy:
+            self.lbl_error.configure(text="")
+            self.progress.pack(pady=5)
+            self.progress.start()
+        else:
+            self.progress.stop()
+            self.progress.pack_forget()
 
     def login(self, event=None):
+        if self.busy:
+            return
+        
         password_str = self.entry_password.get()
         password_bytes = bytearray(password_str.encode('utf-8'))
         
         # Clear the immutable string from memory immediately
         del password_str
         
-        if self.storage.unlock(password_bytes):
-            accounts = self.storage.load_accounts()
+        # Argon2id takes a noticeable fraction of a second; keep the window responsive
+        self.set_busy(True)
+        # Only the metadata is decrypted here; the app loads the secrets in the background
+        future = self.storage.submit(self.storage.unlock_metadata, password_bytes)
+        call_when_done(self.frame, future, lambda f: self._on_unlocked(f, password_bytes))
+
+    def _on_unlocked(self, future, password_bytes):
+        try:
+            accounts = future.result()
+        except Exception:
+            accounts = None
+        
+        if accounts is not None:
             self.on_success(password_bytes, accounts)
         else:
+            self.set_busy(False)
             self.lbl_error.configure(text="Incorrect password")
+            self.entry_password.focus_set()
@@ -1,15 +1,18 @@
 import customtkinter as ctk
 from core.constants import COLOR_TEXT
+from ui.components import call_when_done
 
 class SetupScreen:
     def __init__(self, container, storage, on_success):
         self.container = container
         self.storage = storage
         self.on_success = on_success # callback(password, accounts)
+        self.busy = False
 
     def show(self):
         frame = ctk.CTkFrame(self.container, fg_color="transparent")
         frame.place(relx=0.5, rely=0.5, anchor="center")
+        self.frame = frame
 
         ctk.CTkLabel(frame, text="Create Vault", font=("Roboto", 24, "bold"), text_color=COLOR_TEXT).pack(pady=20)
         ctk.CTkLabel(frame, text="Set a secure password", text_color=COLOR_TEXT).pack(pady=(0, 5))
@@ -22,12 +25,34 @@ class SetupScreen:
         self.entry_confirm.pack(pady=10)
         self.entry_confirm.bind("<Return>", self.setup_vault)
         
-        ctk.CTkButton(frame, text="Create Vault", width=220, command=self.setup_vault).pack(pady=10)
+        self.btn_create = ctk.CTkButton(frame, text="Create Vault", width=220, command=self.setup_vault)
+        self.btn_create.pack(pady=10)
         
         self.lbl_error = ctk.CTkLabel(frame, text="", text_color="red")
         self.lbl_error.pack(pady=5)
+        
+        # Shown while the key derivation runs in the background
+        self.progress = ctk.CTkProgressBar(frame, width=220, mode="indeterminate")
+
+    def set_busy(self, busy):
+        """Disable input and show progress while the vault is created"""
+        self.busy = busy
+        state = "disabled" if busy else "normal"
+        self.entry_password.configure(state=state)
+        self.entry_confirm.configure(state=state)
+        self.btn_create.configure(state=state, text="Creating vault..." if busy else "Create Vault")
+        if busy:
+            self.lbl_error.configure(text="")
+            self.progress.pack(pady=5)
+            self.progress.start()
+        else:
+            self.progress.stop()
+            self.progress.pack_forget()
 
     def setup_vault(self, event=None):
+        if self.busy:
+            return
+        
         password = self.entry_password.get()
         confirm = self.entry_confirm.get()
         
@@ -41,7 +66,24 @@ class SetupScreen:
         
         password_bytes = bytearray(password.encode('utf-8'))
         
-        if self.storage.unlock(password_bytes):
-            accounts = []
-            self.storage.save_accounts(accounts, password_bytes)
-            self.on_success(password_bytes, accounts)
+        self.set_busy(True)
+        future = self.storage.submit(self._create_vault, password_bytes)
+        call_when_done(self.frame, future, lambda f: self._on_created(f, password_bytes))
+
+    def _create_vault(self, password):
+        """Runs on the storage worker"""
+        if not self.storage.unlock(password):
+            return False
+        return self.storage.save_accounts([], password)
+
+    def _on_created(self, future, password_bytes):
+        try:
+            created = future.result()
+        except Exception:
+            created = False
+        
+        if created:
+            self.on_success(password_bytes, [])
+        else:
+            self.set_busy(False)
+            self.lbl_error.configure(text="Failed to create vault")